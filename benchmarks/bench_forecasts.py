@@ -0,0 +1,45 @@
+import datetime as dt
+import pytest
+import synthetic
+from weather.forecast import parse_timeline_csv
+from weather.timeline import ForecastTimeline
+
+
+CHECKPOINTS = [5, 20]
+
+
+@pytest.fixture(scope='module')
+def forecast_text():
+    return synthetic.forecast_csv()
+
+
+def bench_parse_forecast(benchmark, forecast_text):
+    benchmark.group = 'parse forecast'
+    benchmark(parse_timeline_csv, forecast_text)
+
+
+@pytest.mark.parametrize('checkpoints', CHECKPOINTS)
+def bench_timeline(benchmark, forecast_text, checkpoints):
+    benchmark.group = 'forecast timeline'
+    race = synthetic.weather_race(checkpoints)
+    forecasts = {c: parse_timeline_csv(synthetic.forecast_csv(seed=i)) for i, c in enumerate(race.checkpoints)}
+    benchmark(ForecastTimeline, race, forecasts, synthetic.FORECAST_COLUMNS)
+
+
+@pytest.mark.parametrize('checkpoints', CHECKPOINTS)
+def bench_timeline_table(benchmark, checkpoints):
+    benchmark.group = 'forecast table'
+    race = synthetic.weather_race(checkpoints)
+    forecasts = {c: parse_timeline_csv(synthetic.forecast_csv(seed=i)) for i, c in enumerate(race.checkpoints)}
+    timeline = ForecastTimeline(race, forecasts, synthetic.FORECAST_COLUMNS)
+    benchmark(timeline.table, dt.timedelta(hours=6))
+
+
+@pytest.mark.parametrize('race_times', [4, 24])
+def bench_timeline_compare(benchmark, race_times):
+    benchmark.group = 'forecast compare'
+    race = synthetic.weather_race(10)
+    forecasts = {c: parse_timeline_csv(synthetic.forecast_csv(seed=i)) for i, c in enumerate(race.checkpoints)}
+    timeline = ForecastTimeline(race, forecasts, synthetic.FORECAST_COLUMNS)
+    times = [dt.timedelta(hours=2 + h / 2) for h in range(race_times)]
+    benchmark(timeline.compare, times, 'temp')
@@ -0,0 +1,64 @@
+from contextlib import closing
+import pytest
+from member_stats import heart_rate_frame, member_arrays, year_stats
+from webling.sync import WeblingMirror
+from webling import tables
+
+
+MEMBERS = [100, 1_000, 10_000]
+YEARS = list(range(2000, 2026))
+
+
+def parse_members(data: list[dict]):
+    # validation of a full sync, see `WeblingMirror._upsert`
+    return tables.MEMBERS.validate_python(data)
+
+
+@pytest.mark.parametrize('members', MEMBERS)
+def bench_parse_members(benchmark, member_payload, members):
+    benchmark.group = 'parse members'
+    benchmark(parse_members, member_payload(members))
+
+
+@pytest.mark.parametrize('members', MEMBERS)
+def bench_year_stats(benchmark, member_payload, members):
+    benchmark.group = 'year stats'
+    parsed = parse_members(member_payload(members))
+    benchmark(year_stats, parsed, YEARS)
+
+
+@pytest.mark.parametrize('members', MEMBERS)
+def bench_year_stats_arrays(benchmark, member_payload, members):
+    benchmark.group = 'year stats (arrays)'
+    arrays = member_arrays(parse_members(member_payload(members)))
+    benchmark(year_stats, arrays, YEARS)
+
+
+@pytest.mark.parametrize('members', MEMBERS)
+def bench_heart_rate_frame(benchmark, member_payload, members):
+    benchmark.group = 'heart rate frame'
+    stats = year_stats(parse_members(member_payload(members)), YEARS)
+    benchmark(heart_rate_frame, stats)
+
+
+def synced_mirror(payload: list[dict], path) -> WeblingMirror:
+    # the members of a full sync, without a Webling client
+    mirror = WeblingMirror(None, path)
+    with closing(mirror._connect()) as db, db:
+        mirror._upsert(db, 'member', payload)
+        mirror._set_revision(db, 1)
+    return mirror
+
+
+@pytest.mark.parametrize('members', MEMBERS)
+def bench_member_table(benchmark, member_payload, members, tmp_path):
+    benchmark.group = 'member table (mirror)'
+    mirror = synced_mirror(member_payload(members), tmp_path / 'webling.sqlite')
+    benchmark(mirror.member_table)
+
+
+@pytest.mark.parametrize('members', MEMBERS)
+def bench_year_stats_table(benchmark, member_payload, members, tmp_path):
+    benchmark.group = 'year stats (table)'
+    table = synced_mirror(member_payload(members), tmp_path / 'webling.sqlite').member_table()
+    benchmark(year_stats, table, YEARS)
@@ -0,0 +1,104 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+import synthetic
+from conftest import parse_sheet
+from race_matrix import RaceMatrix
+from race_plots import RACE_PLOTS
+from result_sheet import read_result_sheet
+from seedings import add_seedings, seed_matrix
+from skier_search import SkierIndex
+
+
+FIELDS = [(1_000, 5), (1_000, 20), (10_000, 10), (50_000, 5), (50_000, 20)]
+
+
+def _read_pandas(content: bytes) -> RaceMatrix:
+    return RaceMatrix.from_frame(parse_sheet(pd.read_csv(io.BytesIO(content))))
+
+
+def _read_typed(content: bytes) -> RaceMatrix:
+    return RaceMatrix.from_seconds(read_result_sheet(content).set_index('skier'))
+
+
+@pytest.mark.parametrize('read', [_read_pandas, _read_typed], ids=['pandas', 'typed'])
+@pytest.mark.parametrize('skiers,checkpoints', FIELDS)
+def bench_parse_sheet(benchmark, race_csv, skiers, checkpoints, read):
+    benchmark.group = f'parse sheet {skiers}x{checkpoints}'
+    benchmark(read, race_csv(skiers, checkpoints))
+
+
+def bench_parse_sheet_projected(benchmark, race_csv):
+    benchmark.group = 'parse sheet 50000x20'
+    content = race_csv(50_000, 20)
+    benchmark(lambda: RaceMatrix.from_seconds(read_result_sheet(content, checkpoints=['0', '90']).set_index('skier')))
+
+
+@pytest.mark.parametrize('plot', RACE_PLOTS, ids=str)
+@pytest.mark.parametrize('skiers,checkpoints', FIELDS)
+def bench_pre_process(benchmark, race_matrix, plot, skiers, checkpoints):
+    benchmark.group = f'pre-process {plot}'
+    benchmark(plot.pre_process, race_matrix(skiers, checkpoints))
+
+
+@pytest.mark.parametrize('skiers,checkpoints', FIELDS)
+def bench_seed_matrix(benchmark, race_matrix, skiers, checkpoints):
+    benchmark.group = 'seed matrix'
+    benchmark(seed_matrix, race_matrix(skiers, checkpoints), synthetic.seedings())
+
+
+@pytest.mark.parametrize('skiers,checkpoints', [(1_000, 10), (10_000, 10)])
+def bench_add_seedings(benchmark, race_frame, skiers, checkpoints):
+    benchmark.group = 'add seedings (frame)'
+    benchmark(add_seedings, race_frame(skiers, checkpoints), synthetic.seedings())
+
+
+@pytest.mark.parametrize('selected', [10, 100, 1_000])
+def bench_make_figure(benchmark, race_matrix, selected):
+    benchmark.group = 'make figure'
+    race = race_matrix(10_000, 10)
+    selection = race.select(list(race.skiers[:selected]))
+    benchmark(RACE_PLOTS[0].make_figure, selection)
+
+
+@pytest.mark.parametrize('selected', [10, 100, 1_000])
+def bench_figure_json(benchmark, race_matrix, selected):
+    benchmark.group = 'figure json'
+    race = race_matrix(10_000, 10)
+    selection = race.select(list(race.skiers[:selected]))
+    benchmark(RACE_PLOTS[0].figure_json, selection)
+
+
+def _live_update(race: RaceMatrix, arrived: int) -> RaceMatrix:
+    # the race as it was before the last `arrived` skiers reached the finish
+    times = race.times.copy()
+    times[-arrived:, -1] = np.iinfo(np.int64).min
+    return RaceMatrix(times=times, km=race.km, skiers=race.skiers, columns=race.columns)
+
+
+@pytest.mark.parametrize('incremental', [False, True], ids=['reload', 'merge'])
+@pytest.mark.parametrize('skiers', [1_000, 10_000])
+def bench_live_update(benchmark, race_matrix, skiers, incremental):
+    benchmark.group = f'live update {skiers}'
+    race = race_matrix(skiers, 10)
+    before = _live_update(race, 20)
+    before.elapsed
+
+    def update():
+        updated = before.merge(race)[0] if incremental else RaceMatrix(race.times, race.km, race.skiers, race.columns)
+        return seed_matrix(updated, synthetic.seedings()).diff_to_winner()
+    benchmark(update)
+
+
+@pytest.mark.parametrize('skiers', [1_000, 15_000, 50_000])
+def bench_skier_index(benchmark, race_matrix, skiers):
+    benchmark.group = 'skier index'
+    benchmark(SkierIndex, list(race_matrix(skiers, 5).skiers))
+
+
+@pytest.mark.parametrize('query', ['', 'ski', '0042', 'skier 12'])
+def bench_skier_search(benchmark, race_matrix, query):
+    benchmark.group = 'skier search 50000'
+    index = SkierIndex(list(race_matrix(50_000, 5).skiers))
+    benchmark(index.search, query)
@@ -0,0 +1,65 @@
+import pathlib
+import sys
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / 'src'))
+
+import synthetic  # noqa: E402
+from race_matrix import RaceMatrix  # noqa: E402
+
+
+def parse_sheet(sheet: pd.DataFrame) -> pd.DataFrame:
+    # former steps of `race_data.load_race_matrix` after `pd.read_csv`, times of day on 1900-01-01
+    df = sheet.set_index('skier')
+    return df.apply(pd.to_datetime, format='%H:%M:%S')
+
+
+@pytest.fixture(scope='session')
+def race_sheet():
+    cache = {}
+    def get(skiers: int, checkpoints: int) -> pd.DataFrame:
+        if (skiers, checkpoints) not in cache:
+            cache[skiers, checkpoints] = synthetic.race_sheet(skiers, checkpoints)
+        return cache[skiers, checkpoints]
+    return get
+
+
+@pytest.fixture(scope='session')
+def race_csv(race_sheet):
+    cache = {}
+    def get(skiers: int, checkpoints: int) -> bytes:
+        if (skiers, checkpoints) not in cache:
+            cache[skiers, checkpoints] = race_sheet(skiers, checkpoints).to_csv(index=False).encode()
+        return cache[skiers, checkpoints]
+    return get
+
+
+@pytest.fixture(scope='session')
+def race_frame(race_sheet):
+    cache = {}
+    def get(skiers: int, checkpoints: int) -> pd.DataFrame:
+        if (skiers, checkpoints) not in cache:
+            cache[skiers, checkpoints] = parse_sheet(race_sheet(skiers, checkpoints))
+        return cache[skiers, checkpoints]
+    return get
+
+
+@pytest.fixture(scope='session')
+def race_matrix(race_frame):
+    cache = {}
+    def get(skiers: int, checkpoints: int) -> RaceMatrix:
+        if (skiers, checkpoints) not in cache:
+            cache[skiers, checkpoints] = RaceMatrix.from_frame(race_frame(skiers, checkpoints))
+        return cache[skiers, checkpoints]
+    return get
+
+
+@pytest.fixture(scope='session')
+def member_payload():
+    cache = {}
+    def get(members: int) -> list[dict]:
+        if members not in cache:
+            cache[members] = synthetic.member_payload(members)
+        return cache[members]
+    return get
@@ -0,0 +1,129 @@
+"""Synthetic, deterministic stand-ins for the data of the external services."""
+import datetime as dt
+import numpy as np
+import pandas as pd
+from models.weather import Checkpoint, Race
+
+
+FORECAST_COLUMNS = ['temp', 'feelslike', 'dew', 'humidity', 'precip', 'precipprob', 'preciptype', 'snow', 'snowdepth',
+                    'windgust', 'windspeed', 'winddir', 'cloudcover', 'conditions', 'icon']
+CONDITIONS = ['Clear', 'Partially cloudy', 'Overcast', 'Snow', 'Rain, Overcast']
+
+
+def race_sheet(skiers: int, checkpoints: int, distance: int = 90, seed: int = 0) -> pd.DataFrame:
+    """Results sheet as exported from Google Sheets: a `skier` column and one `HH:MM:SS` column per km mark."""
+    rng = np.random.default_rng(seed)
+    km = np.linspace(0, distance, checkpoints).round().astype(int)
+    # wave start within the first hour, section speeds of 8-25 km/h
+    start = 8 * 3600 + rng.integers(0, 3600, skiers)
+    speed = rng.uniform(8, 25, skiers)[:, None] * rng.uniform(0.8, 1.2, (skiers, checkpoints - 1))
+    seconds = np.concatenate([start[:, None], start[:, None] + np.cumsum(np.diff(km) / speed * 3600, axis=1)], axis=1)
+    times = pd.to_timedelta(seconds.round().ravel(), unit='s')
+    text = np.asarray(times.astype(str).str[-8:], dtype=object).reshape(skiers, checkpoints)
+    # some skiers miss a checkpoint or do not finish
+    text[rng.random(text.shape) < 0.02] = np.nan
+    df = pd.DataFrame(text, columns=[str(k) for k in km])
+    df.insert(0, 'skier', [f'Skier {i:05d}' for i in range(skiers)])
+    return df
+
+
+def seedings(levels: int = 10) -> dict[str, dict[str, dt.timedelta]]:
+    limits = [dt.timedelta(hours=3, minutes=20 * i) for i in range(levels)]
+    return {'Reference': {str(i): limit for i, limit in enumerate(limits)}}
+
+
+def member_payload(members: int, seed: int = 0) -> list[dict]:
+    """Webling member objects as returned by `GET /member?format=full`."""
+    rng = np.random.default_rng(seed)
+    statuses = rng.choice(['Aktiv', 'Aspirant', 'Ausgetreten', 'Pastis'], members, p=[0.6, 0.1, 0.25, 0.05])
+    start = rng.integers(1990, 2025, members)
+    payload = []
+    for i in range(members):
+        left = statuses[i] == 'Ausgetreten'
+        payload.append({
+            'id': i + 1,
+            'type': 'member',
+            'properties': {
+                'Talent': bool(rng.random() < 0.1),
+                'Status': str(statuses[i]),
+                'Eintrittsdatum': f'{start[i]}-03-01',
+                'Austrittsdatum': f'{min(start[i] + rng.integers(1, 10), 2025)}-12-31' if left else None,
+                'E-Mail': f'member{i}@example.org',
+                'Vorname': f'First{i}',
+                'Name': f'Last{i}',
+                'Ruhepuls': int(rng.integers(35, 70)) if rng.random() < 0.7 else 0,
+            },
+            'parents': [],
+            'children': {},
+        })
+    return payload
+
+
+def forecast_csv(days: int = 15, start: str = '2024-03-03', seed: int = 0) -> str:
+    """Hourly VisualCrossing timeline export (`contentType=csv`)."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=24 * days, freq='h', name='datetime')
+    n = len(index)
+    hour = index.hour.to_numpy()
+    temp = -5 + 6 * np.sin((hour - 9) / 24 * 2 * np.pi) + rng.normal(0, 1, n).cumsum() * 0.1
+    df = pd.DataFrame({
+        'name': 'synthetic',
+        'temp': temp.round(1),
+        'feelslike': (temp - rng.uniform(0, 6, n)).round(1),
+        'dew': (temp - rng.uniform(1, 5, n)).round(1),
+        'humidity': rng.uniform(50, 100, n).round(1),
+        'precip': rng.exponential(0.2, n).round(2),
+        'precipprob': rng.integers(0, 100, n),
+        'preciptype': rng.choice(['', 'snow', 'rain,snow'], n),
+        'snow': rng.exponential(0.3, n).round(2),
+        'snowdepth': rng.uniform(20, 80, n).round(1),
+        'windgust': rng.uniform(5, 60, n).round(1),
+        'windspeed': rng.uniform(0, 30, n).round(1),
+        'winddir': rng.uniform(0, 360, n).round(1),
+        'cloudcover': rng.uniform(0, 100, n).round(1),
+        'conditions': rng.choice(CONDITIONS, n),
+        'icon': rng.choice(['snow', 'cloudy', 'clear-day'], n),
+    }, index=index)
+    return df.to_csv()
+
+
+def weather_race(checkpoints: int, distance: float = 90, start: dt.datetime = dt.datetime(2024, 3, 3, 8)) -> Race:
+    return Race(name='Synthetic race', start=start, distance=distance, checkpoints=[
+        Checkpoint(name=f'Checkpoint {i}', distance=round(distance * i / (checkpoints - 1), 1),
+                   coordinates=(61.0 + i / 100, 13.0 + i / 100, 300))
+        for i in range(checkpoints)])
+
+
+def member_groups(members: int, groups: int = 5) -> list[dict]:
+    return [{'id': 100_000 + g, 'type': 'membergroup', 'properties': {'title': f'Group {g}'},
+             'children': {'member': list(range(g + 1, members + 1, groups))}}
+            for g in range(groups)]
+
+
+def articles(count: int = 20, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    return [{'id': 200_000 + i, 'type': 'article',
+             'properties': {'title': f'Article {i}', 'price': float(rng.integers(10, 500)),
+                            'quantity': int(rng.integers(0, 20))}}
+            for i in range(count)]
+
+
+def kick_wax_entries(entries: int, seed: int = 0) -> list[dict]:
+    """Rows of the Supabase `kickwax` table, joined with their `kickwax_conditions`."""
+    rng = np.random.default_rng(seed)
+    brands, applications = ['Swix', 'Toko', 'Rode'], ['Gebügelt', 'Gekorkt', 'Verrieben']
+    products = ['V30', 'V40', 'VR45', 'Red', 'Blue', 'Klister']
+    start = dt.date(2020, 12, 1)
+    return [{
+        'id': i + 1,
+        'date': (start + dt.timedelta(days=int(rng.integers(0, 5 * 365)))).isoformat(),
+        'name': f'Training {i}',
+        'location': str(rng.choice(['Davos', 'Pontresina', 'Einsiedeln', 'Mora'])),
+        'success_rate': int(rng.integers(1, 6)),
+        'created_by': f'00000000-0000-0000-0000-{rng.integers(0, 20):012d}',
+        'layers': [{'brand': str(rng.choice(brands)), 'name': str(rng.choice(products)),
+                    'application': str(rng.choice(applications))}
+                   for _ in range(int(rng.integers(1, 4)))],
+        'temp': round(float(rng.uniform(-20, 5)), 1),
+        'humidity': round(float(rng.uniform(40, 100)), 1),
+    } for i in range(entries)]
@@ -0,0 +1,81 @@
+"""Records the responses of the real services as fixtures for the stand-in servers.
+
+    python loadtest/record.py
+
+Uses the app's configuration (`.env`), so it needs the same API keys and
+Supabase account as the app. The fixtures contain personal data of members
+and are not committed.
+"""
+import argparse
+import json
+import pathlib
+import requests
+
+from stubs import FIXTURES_PATH, _file_name
+
+
+def write(path: pathlib.Path, content: bytes | str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, str):
+        content = content.encode()
+    path.write_bytes(content)
+    print(f'{path} ({len(content)} bytes)')
+
+
+def record_webling(directory: pathlib.Path):
+    from member_data import get_webling_client
+    for type_ in ('member', 'membergroup', 'article'):
+        write(directory / 'webling' / f'{type_}.json', get_webling_client().get(type_, {'format': 'full'}).content)
+
+
+def record_sheets(directory: pathlib.Path):
+    from race_data import sheets_cfg
+    from races import load_races
+    for race in load_races():
+        response = requests.get(f'{sheets_cfg.baseUrl}/{race.doc_id}/export',
+                                params={'format': 'csv', 'gid': race.sheet_id}, timeout=sheets_cfg.timeout)
+        response.raise_for_status()
+        write(directory / 'sheets' / f'{_file_name(f"{race.doc_id}_{race.sheet_id}")}.csv', response.content)
+
+
+def record_forecasts(directory: pathlib.Path):
+    from weather_data import get_forecast_client, load_weather_races
+    locations = {checkpoint.location for race in load_weather_races() for checkpoint in race.checkpoints}
+    for location, forecast in get_forecast_client().load_many(locations).items():
+        if forecast is not None:
+            write(directory / 'forecasts' / f'{_file_name(location)}.csv', forecast.to_csv())
+
+
+def record_supabase(directory: pathlib.Path):
+    from login import get_shared_supabase_client
+    client = get_shared_supabase_client()
+    entries = client.table('kickwax').select('*').execute().data
+    conditions = {row['kickwax_id']: row for row in
+                  client.table('kickwax_conditions').select('kickwax_id', 'temp', 'humidity').execute().data}
+    for entry in entries:
+        entry.update({k: conditions.get(entry['id'], {}).get(k) for k in ('temp', 'humidity')})
+    write(directory / 'supabase' / 'kickwax.json', json.dumps(entries))
+
+
+SERVICES = {
+    'webling': record_webling,
+    'sheets': record_sheets,
+    'visualcrossing': record_forecasts,
+    'supabase': record_supabase,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('services', nargs='*', metavar='SERVICE', help=f'one of {", ".join(SERVICES)}, default all')
+    parser.add_argument('--fixtures', default=str(FIXTURES_PATH))
+    args = parser.parse_args()
+    unknown = set(args.services) - set(SERVICES)
+    if unknown:
+        parser.error(f'unknown services {", ".join(sorted(unknown))}')
+    for service in args.services or SERVICES:
+        SERVICES[service](pathlib.Path(args.fixtures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""Drives concurrent sessions through all pages of the app against the stand-in servers.
+
+    python loadtest/run.py --sessions 20 --reruns 3
+
+Starts the stand-in servers and `streamlit run src/Home.py` with empty
+caches, then connects `--sessions` websocket clients at once. Every client
+opens each page and reruns it `--reruns` times, just like a browser tab that
+navigates and interacts. The latency of a run is the time from the rerun
+request until the server reports the script as finished, including the
+transfer of all elements, but not the rendering in the browser. Peak memory
+is the high water mark of the server process (Linux only).
+"""
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+from stubs import FIXTURES_PATH, ROOT_PATH, Fixtures, StubServer
+
+
+# url paths of the pages, '' is the home page
+PAGES = ['', 'Mitglieder', 'Race_Analysis', 'Interna', 'Weather_for_Races', 'Supabase', 'Diagnostics']
+PERCENTILES = (50, 95, 99)
+PASSWORD = 'load-test'
+
+
+@dataclass
+class Run:
+    page: str
+    seconds: float
+    size: int
+    error: str | None
+
+
+async def rerun(ws, page: str, widgets: list | None = None) -> tuple[Run, list[ForwardMsg]]:
+    """Requests a run of `page` and waits until it finished."""
+    message = BackMsg()
+    message.rerun_script.page_name = page
+    message.rerun_script.widget_states.widgets.extend(widgets or [])
+    start = time.perf_counter()
+    await ws.send(message.SerializeToString())
+    deltas, size, error = [], 0, None
+    while True:
+        data = await ws.recv()
+        size += len(data)
+        msg = ForwardMsg()
+        msg.ParseFromString(data)
+        kind = msg.WhichOneof('type')
+        if kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            deltas.append(msg)
+            if msg.delta.new_element.WhichOneof('type') == 'exception' and error is None:
+                error = msg.delta.new_element.exception.message
+        elif kind == 'script_finished':
+            return Run(page, time.perf_counter() - start, size, error), deltas
+
+
+def password_widgets(deltas: list[ForwardMsg]) -> list:
+    """Widget state entering `PASSWORD` into the password form of the internal pages, if shown."""
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+    for msg in deltas:
+        element = msg.delta.new_element
+        if element.WhichOneof('type') == 'text_input' and element.text_input.type == element.text_input.PASSWORD:
+            return [WidgetState(id=element.text_input.id, string_value=PASSWORD)]
+    return []
+
+
+async def session(url: str, pages: list[str], reruns: int, delay: float) -> list[Run]:
+    await asyncio.sleep(delay)
+    runs = []
+    async with websockets.connect(url, subprotocols=['streamlit'], max_size=None) as ws:
+        for page in pages:
+            run, deltas = await rerun(ws, page)
+            runs.append(run)
+            widgets = password_widgets(deltas)
+            if widgets:
+                # logging in is part of the session, but not measured
+                await rerun(ws, page, widgets)
+            for _ in range(reruns):
+                run, _ = await rerun(ws, page)
+                runs.append(run)
+    return runs
+
+
+async def load_test(url: str, pages: list[str], sessions: int, reruns: int, ramp: float) -> list[Run]:
+    results = await asyncio.gather(*[session(url, pages, reruns, ramp * i / sessions) for i in range(sessions)],
+                                   return_exceptions=True)
+    runs = []
+    for result in results:
+        if isinstance(result, BaseException):
+            runs.append(Run('(connection)', 0, 0, repr(result)))
+        else:
+            runs.extend(result)
+    return runs
+
+
+def report(runs: list[Run], pages: list[str]) -> dict[str, dict]:
+    by_page: defaultdict[str, list[Run]] = defaultdict(list)
+    for run in runs:
+        by_page[run.page].append(run)
+    rows = {}
+    for page in [*pages, '(connection)']:
+        if not by_page[page]:
+            continue
+        seconds = np.array([run.seconds for run in by_page[page]])
+        errors = [run.error for run in by_page[page] if run.error]
+        rows[page or '(home)'] = {
+            'runs': len(seconds),
+            'errors': len(errors),
+            **{f'p{p} [ms]': round(float(v) * 1000, 1) for p, v in zip(PERCENTILES, np.percentile(seconds, PERCENTILES))},
+            'max [ms]': round(float(seconds.max()) * 1000, 1),
+            'size [kB]': round(float(np.mean([run.size for run in by_page[page]])) / 1000, 1),
+            'first error': errors[0] if errors else None,
+        }
+    return rows
+
+
+def print_report(rows: dict[str, dict]):
+    columns = ['runs', 'errors', *[f'p{p} [ms]' for p in PERCENTILES], 'max [ms]', 'size [kB]']
+    width = max(len(page) for page in rows)
+    print(f'{"page":<{width}}  ' + '  '.join(f'{c:>10}' for c in columns))
+    for page, row in rows.items():
+        print(f'{page:<{width}}  ' + '  '.join(f'{row[c]:>10}' for c in columns))
+    for page, row in rows.items():
+        if row['first error']:
+            print(f'\n{page}: {row["first error"]}')
+
+
+def peak_memory_mb(pid: int) -> float | None:
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            return next(int(line.split()[1]) / 1024 for line in f if line.startswith('VmHWM:'))
+    except (OSError, StopIteration):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_app(environment: dict[str, str], port: int, log: pathlib.Path, timeout: float = 60) -> subprocess.Popen:
+    with open(log, 'w') as output:
+        app = subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', 'src/Home.py', '--server.headless=true', f'--server.port={port}',
+             '--server.fileWatcherType=none', '--browser.gatherUsageStats=false'],
+            cwd=ROOT_PATH, env={**os.environ, **environment}, stdout=output, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if app.poll() is not None:
+            raise RuntimeError(f'App exited: {log.read_text()}')
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1)
+            return app
+        except OSError:
+            time.sleep(0.2)
+    app.terminate()
+    raise RuntimeError(f'App did not start within {timeout} s')
+
+
+def parse_latency(values: list[str]) -> dict[str, float]:
+    """`service=seconds` pairs, e.g. `webling=0.3`."""
+    return {service: float(seconds) for service, seconds in (value.split('=', 1) for value in values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=10, help='concurrent sessions')
+    parser.add_argument('--reruns', type=int, default=2, help='reruns per page and session after opening it')
+    parser.add_argument('--ramp', type=float, default=0, help='seconds over which the sessions are started')
+    parser.add_argument('--pages', nargs='+', default=PAGES, help="url paths of the pages, '' for the home page")
+    parser.add_argument('--fixtures', default=str(FIXTURES_PATH), help='recorded fixtures, see record.py')
+    parser.add_argument('--latency', nargs='*', default=[], metavar='SERVICE=SECONDS',
+                        help='response delay of webling, sheets, visualcrossing or supabase')
+    parser.add_argument('--members', type=int, default=300, help='synthetic members if none are recorded')
+    parser.add_argument('--skiers', type=int, default=500, help='synthetic skiers per race if none are recorded')
+    parser.add_argument('--no-warmup', action='store_true', help='measure the first sessions with cold caches')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    fixtures = Fixtures(args.fixtures, members=args.members, skiers=args.skiers)
+    server = StubServer(fixtures, latency=parse_latency(args.latency)).start()
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix='loadtest-') as cache_dir:
+        cache = pathlib.Path(cache_dir)
+        app = start_app({
+            **server.environment(),
+            'WEBLING_MIRRORPATH': str(cache / 'webling.sqlite'),
+            'WEBLING_STATSDIR': str(cache),
+            'WEBLING_STATSFILE': str(cache / 'year_stats.json'),
+            'SHEETS_CACHEDIR': str(cache / 'sheets'),
+            'SHEETS_RESULTSDIR': str(cache / 'results'),
+            'VISUALCROSSING_CACHEDIR': str(cache / 'forecasts'),
+            'METRICS_FILE': str(cache / 'metrics.prom'),
+            'ARTIFACTS_DIR': str(cache / 'artifacts'),
+            'INTERNA_PASSWORD': PASSWORD,
+        }, port, cache / 'app.log')
+        url = f'ws://127.0.0.1:{port}/_stcore/stream'
+        try:
+            if not args.no_warmup:
+                asyncio.run(load_test(url, args.pages, 1, 0, 0))
+            warm_memory = peak_memory_mb(app.pid)
+            start = time.perf_counter()
+            runs = asyncio.run(load_test(url, args.pages, args.sessions, args.reruns, args.ramp))
+            elapsed = time.perf_counter() - start
+            memory = peak_memory_mb(app.pid)
+        finally:
+            app.terminate()
+            app.wait()
+            server.stop()
+
+    rows = report(runs, args.pages)
+    print(f'{args.sessions} sessions, {len(runs)} runs in {elapsed:.1f} s ({len(runs) / elapsed:.1f} runs/s)')
+    if memory is not None:
+        print(f'peak memory of the app {memory:.0f} MB (after warmup {warm_memory:.0f} MB)')
+    print(f'stand-in requests {dict(server.requests)}\n')
+    print_report(rows)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'sessions': args.sessions, 'reruns': args.reruns, 'seconds': elapsed, 'peak_memory_mb': memory,
+                       'requests': dict(server.requests), 'pages': rows}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
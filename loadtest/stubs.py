@@ -0,0 +1,309 @@
+"""Stand-in servers for Webling, Google Sheets, VisualCrossing and Supabase.
+
+One HTTP server answers for all four services under their own path prefix
+(`/webling/api/1`, `/sheets`, `/visualcrossing`, `/supabase`). Responses come
+from recorded fixtures (see `record.py`), anything that was not recorded is
+generated by `benchmarks/synthetic.py`. `latency` delays the responses of a
+service, to emulate the round trip times of the real APIs.
+"""
+import datetime as dt
+import hashlib
+import json
+import pathlib
+import re
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote_plus, urlsplit
+import jwt
+
+ROOT_PATH = pathlib.Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT_PATH / 'src'), str(ROOT_PATH / 'benchmarks')]
+
+import synthetic  # noqa: E402
+
+
+FIXTURES_PATH = ROOT_PATH / 'loadtest' / 'fixtures'
+JWT_SECRET = 'load-test-secret-with-at-least-32-characters'
+REVISION = 1
+
+
+class Fixtures:
+    """Recorded responses below `directory`, with synthetic data for the missing ones.
+
+    Layout: `webling/<member|membergroup|article>.json`,
+    `sheets/<spreadsheet>_<sheet>.csv`, `forecasts/<location>.csv` and
+    `supabase/kickwax.json`.
+    """
+
+    def __init__(self, directory: str | pathlib.Path = FIXTURES_PATH, members: int = 300, skiers: int = 500,
+                 checkpoints: int = 10, entries: int = 200):
+        self.directory = pathlib.Path(directory)
+        self.members = members
+        self.skiers = skiers
+        self.checkpoints = checkpoints
+        self.entries = entries
+        self._lock = threading.Lock()
+        self._loaded: dict[str, object] = {}
+
+    def webling(self, type_: str) -> list[dict]:
+        def generate():
+            if type_ == 'member':
+                payload = synthetic.member_payload(self.members)
+                # at least one active member for the Supabase login
+                payload[0]['properties']['Status'] = 'Aktiv'
+                return payload
+            if type_ == 'membergroup':
+                return synthetic.member_groups(self.members)
+            return synthetic.articles()
+        return self._get(f'webling/{type_}.json', json.loads, generate)
+
+    def sheet(self, spreadsheet_id: str, sheet_id: str) -> bytes:
+        key = f'{spreadsheet_id}_{sheet_id}'
+        return self._get(f'sheets/{_file_name(key)}.csv', bytes, lambda: synthetic.race_sheet(
+            self.skiers, self.checkpoints, seed=zlib.crc32(key.encode())).to_csv(index=False).encode())
+
+    def forecast(self, location: str) -> bytes:
+        return self._get(f'forecasts/{_file_name(location)}.csv', bytes, lambda: synthetic.forecast_csv(
+            start=(dt.date.today() - dt.timedelta(days=1)).isoformat(), seed=zlib.crc32(location.encode())).encode())
+
+    def kick_wax(self) -> list[dict]:
+        return self._get('supabase/kickwax.json', json.loads, lambda: synthetic.kick_wax_entries(self.entries))
+
+    def active_email(self) -> str:
+        return next(m['properties']['E-Mail'] for m in self.webling('member')
+                    if m['properties'].get('Status') == 'Aktiv' and m['properties'].get('E-Mail'))
+
+    def _get(self, name: str, parse, generate):
+        with self._lock:
+            if name not in self._loaded:
+                path = self.directory / name
+                self._loaded[name] = parse(path.read_bytes()) if path.exists() else generate()
+            return self._loaded[name]
+
+
+def _file_name(key: str) -> str:
+    return re.sub(r'[^\w-]+', '_', key)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fixtures: Fixtures, host: str = '127.0.0.1', port: int = 0,
+                 latency: dict[str, float] | None = None):
+        super().__init__((host, port), _Handler)
+        self.fixtures = fixtures
+        self.latency = latency or {}
+        self.requests: defaultdict[str, int] = defaultdict(int)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def environment(self) -> dict[str, str]:
+        """Environment variables pointing the app's configs to this server."""
+        return {
+            'WEBLING_APIURL': f'{self.url}/webling/api/1',
+            'WEBLING_APIKEY': 'load-test',
+            'SHEETS_BASEURL': f'{self.url}/sheets',
+            'VISUALCROSSING_APIURL': f'{self.url}/visualcrossing',
+            'VISUALCROSSING_APIKEY': 'load-test',
+            'SUPABASE_URL': f'{self.url}/supabase',
+            'SUPABASE_KEY': jwt.encode({'role': 'anon'}, JWT_SECRET, algorithm='HS256'),
+            'SUPABASE_EMAIL': self.fixtures.active_email(),
+            'SUPABASE_PASSWORD': 'load-test',
+            'SUPABASE_JWTSECRET': JWT_SECRET,
+        }
+
+    def start(self) -> 'StubServer':
+        self._thread = threading.Thread(target=self.serve_forever, name='stub-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubServer
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_HEAD(self):
+        self._dispatch('HEAD')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        self.body = json.loads(self.rfile.read(length) or b'null') if length else None
+        service, _, path = url.path.lstrip('/').partition('/')
+        handler = getattr(self, f'_{service}', None)
+        if handler is None:
+            return self._send(404, {'message': f'Unknown service {service}'})
+        self.server.requests[service] += 1
+        time.sleep(self.server.latency.get(service, 0))
+        try:
+            handler(method, unquote_plus(path))
+        except Exception as e:
+            self._send(500, {'message': str(e)})
+
+    def _webling(self, method: str, path: str):
+        route = path.removeprefix('api/1/')
+        if route == 'replicate':
+            return self._send(200, {'revision': REVISION})
+        if route.startswith('replicate/'):
+            return self._send(200, {'revision': REVISION, 'objects': {}, 'deleted': []})
+        type_, _, ids = route.partition('/')
+        if type_ not in ('member', 'membergroup', 'article'):
+            return self._send(404, {'error': f'Unknown route {route}'})
+        objects = self.server.fixtures.webling(type_)
+        if ids:
+            wanted = {int(i) for i in ids.split(',')}
+            objects = [o for o in objects if o['id'] in wanted]
+        self._send(200, objects)
+
+    def _sheets(self, method: str, path: str):
+        spreadsheet_id = path.split('/')[0]
+        content = self.server.fixtures.sheet(spreadsheet_id, self.query.get('gid', '0'))
+        etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, b'', headers={'ETag': etag})
+        self._send(200, content, 'text/csv', {'ETag': etag})
+
+    def _visualcrossing(self, method: str, path: str):
+        location = path.removeprefix('timeline/').split('/')[0]
+        self._send(200, self.server.fixtures.forecast(location), 'text/csv')
+
+    def _supabase(self, method: str, path: str):
+        if path.startswith('auth/v1/'):
+            return self._auth(method, path.removeprefix('auth/v1/'))
+        if path.startswith('rest/v1/rpc/'):
+            return self._rpc(path.removeprefix('rest/v1/rpc/'))
+        if path == 'rest/v1/kickwax':
+            return self._kick_wax(method)
+        if path == 'rest/v1/kickwax_conditions':
+            return self._send(200, [{'kickwax_id': r['id'], 'temp': r.get('temp'), 'humidity': r.get('humidity')}
+                                    for r in self.server.fixtures.kick_wax()])
+        self._send(404, {'message': f'Unknown route {path}'})
+
+    def _auth(self, method: str, route: str):
+        if route == 'token':
+            email = (self.body or {}).get('email') or 'load-test@example.org'
+            return self._send(200, _session(email))
+        if route == 'user':
+            token = self.headers.get('Authorization', '').removeprefix('Bearer ')
+            try:
+                claims = jwt.decode(token, JWT_SECRET, algorithms=['HS256'], audience='authenticated')
+            except jwt.InvalidTokenError as e:
+                return self._send(401, {'msg': str(e)})
+            return self._send(200, _user(claims['email'], claims['sub']))
+        if route == 'logout':
+            return self._send(204, b'')
+        self._send(404, {'msg': f'Unknown route {route}'})
+
+    def _kick_wax(self, method: str):
+        rows = self.server.fixtures.kick_wax()
+        if method == 'POST':
+            # writes are accepted but not applied, every session sees the same table
+            added = self.body if isinstance(self.body, list) else [self.body]
+            return self._send(201, [{**row, 'id': len(rows) + i + 1} for i, row in enumerate(added)])
+        if method == 'DELETE':
+            return self._send(204, b'')
+        if 'id' in self.query:
+            rows = [r for r in rows if str(r['id']) == self.query['id'].removeprefix('eq.')]
+        for order in reversed(self.query.get('order', '').split(',')):
+            if order:
+                column, _, direction = order.partition('.')
+                rows = sorted(rows, key=lambda r: r[column], reverse=direction.startswith('desc'))
+        offset = int(self.query.get('offset', 0))
+        rows = rows[offset:offset + int(self.query['limit'])] if 'limit' in self.query else rows[offset:]
+        columns = self.query.get('select', '*').split(',')
+        data = [r if columns == ['*'] else {c: r[c] for c in columns} for r in rows]
+        headers = {'Content-Range': f'{offset}-{offset + len(data) - 1}/{len(self.server.fixtures.kick_wax())}'}
+        if method == 'HEAD':
+            return self._send(200, b'', headers=headers)
+        if 'vnd.pgrst.object' in self.headers.get('Accept', ''):
+            return self._send(200, data[0]) if len(data) == 1 else self._send(406, {'message': 'Not a single row'})
+        self._send(200, data, headers=headers)
+
+    def _rpc(self, function: str):
+        rows = self.server.fixtures.kick_wax()
+        params = self.body or {}
+        if function == 'kickwax_success_by':
+            dimension = params['dimension']
+            groups = defaultdict(list)
+            for row in rows:
+                keys = {_combination(row['layers'])} if dimension == 'combination' else {
+                    layer[dimension] for layer in row['layers']}
+                for key in keys:
+                    groups[key].append(row['success_rate'])
+            data = [{'key': k, 'entries': len(v), 'success_rate': round(sum(v) / len(v), 2)} for k, v in groups.items()]
+            return self._send(200, sorted(data, key=lambda r: (r['success_rate'], r['entries']), reverse=True))
+        if function == 'kickwax_at_conditions':
+            groups = defaultdict(list)
+            for row in rows:
+                if row.get('temp') is None or row.get('humidity') is None:
+                    continue
+                if (abs(row['temp'] - params['temp']) <= params['temp_tolerance']
+                        and abs(row['humidity'] - params['humidity']) <= params['humidity_tolerance']):
+                    groups[_combination(row['layers'])].append(row['success_rate'])
+            data = [{'combination': k, 'entries': len(v), 'success_rate': round(sum(v) / len(v), 2)}
+                    for k, v in groups.items()]
+            data.sort(key=lambda r: (r['success_rate'], r['entries']), reverse=True)
+            return self._send(200, data[:params.get('top', 10)])
+        if function == 'kickwax_without_conditions':
+            return self._send(200, [])
+        if function in ('kickwax_set_conditions', 'kickwax_conditions_failed'):
+            return self._send(204, b'')
+        self._send(404, {'message': f'Unknown function {function}'})
+
+    def _send(self, status: int, body, content_type: str = 'application/json', headers: dict[str, str] | None = None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+
+def _combination(layers: list[dict]) -> str:
+    return ' / '.join(f"{l['brand']} {l['name']} - {l['application']}" for l in layers)
+
+
+def _user(email: str, user_id: str) -> dict:
+    return {'id': user_id, 'aud': 'authenticated', 'role': 'authenticated', 'email': email,
+            'app_metadata': {'provider': 'email'}, 'user_metadata': {},
+            'created_at': '2024-01-01T00:00:00Z', 'identities': []}
+
+
+def _session(email: str, expires_in: int = 3600) -> dict:
+    user_id = str(uuid.uuid5(uuid.NAMESPACE_URL, email))
+    now = int(time.time())
+    claims = {'sub': user_id, 'email': email, 'aud': 'authenticated', 'role': 'authenticated',
+              'iat': now, 'exp': now + expires_in, 'app_metadata': {'provider': 'email'}, 'user_metadata': {}}
+    return {'access_token': jwt.encode(claims, JWT_SECRET, algorithm='HS256'), 'token_type': 'bearer',
+            'expires_in': expires_in, 'expires_at': now + expires_in, 'refresh_token': uuid.uuid4().hex,
+            'user': _user(email, user_id)}
@@ -1,18 +1,33 @@
 import streamlit as st
 from streamlit.logger import get_logger
-from utils import page_config
+from utils import page_config, page_run
 
 
 LOGGER = get_logger(__name__)
 
 
-def run():
-    page_config()
+def home():
     st.title("LC Zürich-Doppelstock Data Analysis")
 
     st.write("Diese App visualisiert diverse Daten von/für/durch Langlaufclub Zürich-Doppelstock.")
 
 
+def run():
+    page_config()
+    page = st.navigation([
+        st.Page(home, title='Home', default=True),
+        st.Page('pages/0_Mitglieder.py'),
+        st.Page('pages/1_Race_Analysis.py'),
+        st.Page('pages/2_Interna.py'),
+        st.Page('pages/3_Weather_for_Races.py'),
+        st.Page('pages/4_Supabase.py'),
+        # only reachable by its url
+        st.Page('pages/5_Diagnostics.py', visibility='hidden'),
+    ])
+    with page_run(page.title):
+        page.run()
+
+
 if __name__ == '__main__':
     LOGGER.info('Starting app')
-    run()
\ No newline at end of file
+    run()
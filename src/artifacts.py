@@ -0,0 +1,115 @@
+import hashlib
+import io
+import json
+import os
+import pathlib
+import re
+import time
+from dataclasses import dataclass
+from typing import Any
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from streamlit.logger import get_logger
+from atomic_file import atomic_path
+
+
+LOGGER = get_logger(__name__)
+
+META_KEY = b'artifact'
+
+
+@dataclass(frozen=True)
+class Artifact:
+    name: str
+    version: str
+    path: pathlib.Path
+    created: float
+    meta: dict[str, Any]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created
+
+    def frame(self) -> pd.DataFrame:
+        return pq.read_table(self.path).to_pandas()
+
+    def json(self) -> Any:
+        with open(self.path, 'r') as f:
+            return json.load(f)['data']
+
+
+class ArtifactStore:
+    """Versioned results of the precompute job (`precompute.py`), read by the pages.
+
+    Every artifact is a directory of immutable versions, `<name>/<version>.parquet`
+    for frames and `<name>/<version>.json` for anything else. The version is
+    the UTC time of publishing followed by a content hash, so the newest
+    version sorts last. Publishing content equal to the newest version only
+    renews its timestamp. The `keep` newest versions are kept.
+    """
+
+    def __init__(self, directory: str | pathlib.Path, keep: int = 5):
+        self.directory = pathlib.Path(directory)
+        self.keep = keep
+
+    def publish_frame(self, name: str, df: pd.DataFrame, meta: dict[str, Any] | None = None) -> Artifact:
+        table = pa.Table.from_pandas(df)
+        buffer = io.BytesIO()
+        pq.write_table(table.replace_schema_metadata({
+            **(table.schema.metadata or {}), META_KEY: json.dumps(meta or {}).encode()}), buffer)
+        return self._publish(name, '.parquet', buffer.getvalue(), meta or {})
+
+    def publish_json(self, name: str, data: Any, meta: dict[str, Any] | None = None) -> Artifact:
+        content = json.dumps({'meta': meta or {}, 'data': data}, separators=(',', ':')).encode()
+        return self._publish(name, '.json', content, meta or {})
+
+    def latest(self, name: str, max_age: float | None = None) -> Artifact | None:
+        """Newest version of `name`, `None` if there is none or it is older than `max_age` seconds."""
+        versions = self._versions(name)
+        if not versions:
+            return None
+        path = versions[-1]
+        try:
+            artifact = Artifact(name, path.stem, path, path.stat().st_mtime, self._meta(path))
+        except (OSError, ValueError) as e:
+            # pruned or replaced in the meantime
+            LOGGER.warning('Could not read artifact %s: %s', path, e)
+            return None
+        if max_age is not None and artifact.age > max_age:
+            return None
+        return artifact
+
+    def _publish(self, name: str, suffix: str, content: bytes, meta: dict[str, Any]) -> Artifact:
+        directory = self._directory(name)
+        directory.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        versions = self._versions(name)
+        if versions and versions[-1].stem.endswith(digest):
+            os.utime(versions[-1])
+            path = versions[-1]
+        else:
+            path = directory / f'{time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())}-{digest}{suffix}'
+            with atomic_path(path) as tmp:
+                tmp.write_bytes(content)
+            for old in versions[:-self.keep + 1] if self.keep > 1 else versions:
+                old.unlink(missing_ok=True)
+            LOGGER.info('Published %s version %s', name, path.stem)
+        return Artifact(name, path.stem, path, path.stat().st_mtime, meta)
+
+    def _versions(self, name: str) -> list[pathlib.Path]:
+        directory = self._directory(name)
+        if not directory.exists():
+            return []
+        return sorted(p for p in directory.iterdir() if p.suffix in ('.parquet', '.json'))
+
+    def _directory(self, name: str) -> pathlib.Path:
+        return self.directory / re.sub(r'[^\w/-]+', '_', name)
+
+    @staticmethod
+    def _meta(path: pathlib.Path) -> dict[str, Any]:
+        if path.suffix == '.parquet':
+            metadata = pq.read_schema(path).metadata or {}
+            return json.loads(metadata.get(META_KEY, b'{}'))
+        with open(path, 'r') as f:
+            return json.load(f)['meta']
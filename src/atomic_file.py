@@ -0,0 +1,22 @@
+import os
+import pathlib
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def atomic_path(path: str | pathlib.Path) -> Iterator[pathlib.Path]:
+    """Temporary file next to `path` that replaces `path` once the block succeeds.
+
+    Every writer gets its own uniquely named file, so processes and threads
+    writing the same `path` at once never write into the same temporary file.
+    The last replace wins, readers always see a complete file.
+    """
+    path = pathlib.Path(path)
+    tmp = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
@@ -0,0 +1,49 @@
+import datetime as dt
+from typing import Any
+import jwt
+from gotrue.types import User
+
+
+class TokenVerifier:
+    """Verifies Supabase access tokens locally.
+
+    Asymmetrically signed tokens are checked against the project's JWKS, which
+    is fetched once and cached by `PyJWKClient`. Tokens signed with the legacy
+    shared secret (HS256) need `jwt_secret`.
+    """
+
+    ASYMMETRIC = ['RS256', 'ES256', 'EdDSA']
+
+    def __init__(self, url: str, jwt_secret: str = '', audience: str = 'authenticated', jwks_lifespan: int = 3600):
+        self.jwt_secret = jwt_secret
+        self.audience = audience
+        self._jwks = jwt.PyJWKClient(f'{url}/auth/v1/.well-known/jwks.json', cache_keys=True, lifespan=jwks_lifespan)
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Claims of a valid token, raises `jwt.InvalidTokenError` otherwise."""
+        alg = jwt.get_unverified_header(token).get('alg')
+        if alg == 'HS256':
+            if not self.jwt_secret:
+                raise jwt.InvalidTokenError('HS256 token but no JWT secret configured')
+            key: Any = self.jwt_secret
+        elif alg in self.ASYMMETRIC:
+            try:
+                key = self._jwks.get_signing_key_from_jwt(token).key
+            except (jwt.PyJWKClientError, jwt.PyJWKError) as e:
+                raise jwt.InvalidTokenError(str(e)) from e
+        else:
+            raise jwt.InvalidTokenError(f'Unsupported token algorithm {alg}')
+        return jwt.decode(token, key, algorithms=[alg], audience=self.audience, options={'require': ['exp', 'sub']})
+
+
+def user_from_claims(claims: dict[str, Any]) -> User:
+    return User(
+        id=claims['sub'],
+        email=claims.get('email'),
+        phone=claims.get('phone'),
+        role=claims.get('role'),
+        aud=claims.get('aud', ''),
+        app_metadata=claims.get('app_metadata', {}),
+        user_metadata=claims.get('user_metadata', {}),
+        created_at=dt.datetime.fromtimestamp(claims.get('iat', 0), dt.timezone.utc),
+        is_anonymous=claims.get('is_anonymous', False))
@@ -0,0 +1,165 @@
+import datetime as dt
+from typing import Callable
+import pandas as pd
+from requests import RequestException
+from streamlit.logger import get_logger
+from postgrest import APIError, APIResponse
+from supabase import Client
+from metrics import METRICS
+from models.kick_wax import KickWaxAdd, KickWaxEntry, SingleLayer
+from ttl_cache import TTLCache
+
+
+TABLE = 'kickwax'
+SUMMARY_COLUMNS = ['id', 'date', 'name', 'location', 'success_rate', 'created_by']
+# hours of the day averaged into the conditions of an entry
+DAYTIME = (8, 16)
+
+LOGGER = get_logger(__name__)
+
+# shared by all sessions, entries are keyed by user since row level security may differ per user
+_cache: TTLCache[tuple, object] = TTLCache(ttl=300, maxsize=1024, name='kick_wax')
+
+
+def _execute(query, operation: str) -> APIResponse:
+    with METRICS.timer('outbound_request_seconds', dependency='supabase', operation=operation):
+        return query.execute()
+
+
+class KickWaxRepository:
+    """Queries of the kick wax page.
+
+    The table only loads the summary columns of one page of entries, the wax
+    layers are loaded for the selected entry only. Results are cached per user
+    and dropped whenever an entry is added or deleted through this repository.
+    """
+
+    def __init__(self, client: Client, user_id: str, page_size: int = 50):
+        self.client = client
+        self.user_id = user_id
+        self.page_size = page_size
+
+    def count(self) -> int:
+        def load():
+            response = _execute(self.client.table(TABLE).select('id', count='exact', head=True), 'count')
+            return response.count or 0
+        return _cache.get((self.user_id, 'count'), load)
+
+    def page(self, number: int) -> pd.DataFrame:
+        """Summary of the entries on page `number` (starting at 0), newest first."""
+        def load():
+            first = number * self.page_size
+            query = (self.client.table(TABLE)
+                     .select(*SUMMARY_COLUMNS)
+                     .order('date', desc=True)
+                     .order('id', desc=True)
+                     .range(first, first + self.page_size - 1))
+            response = _execute(query, 'page')
+            df = pd.DataFrame(response.data, columns=SUMMARY_COLUMNS)
+            df['mine'] = df['created_by'] == self.user_id
+            return df
+        return _cache.get((self.user_id, 'page', number, self.page_size), load).copy()
+
+    def layers(self, entry_id: int) -> list[SingleLayer]:
+        def load():
+            response = _execute(self.client.table(TABLE).select('layers').eq('id', entry_id).single(), 'layers')
+            return [SingleLayer(**layer) for layer in response.data['layers']]
+        return _cache.get((self.user_id, 'layers', entry_id), load)
+
+    def entry(self, summary: pd.Series) -> KickWaxEntry:
+        """Full entry of a summary row, loading its layers."""
+        return KickWaxEntry(**summary[['id', 'date', 'name', 'location', 'success_rate', 'mine']],
+                            layers=self.layers(int(summary['id'])))
+
+    def insert(self, entry: KickWaxAdd) -> int:
+        """Adds `entry`, returns its id."""
+        response = _execute(self.client.table(TABLE).insert(entry.model_dump()), 'insert')
+        _cache.invalidate()
+        return response.data[0]['id']
+
+    def delete(self, entry_id: int):
+        _execute(self.client.table(TABLE).delete().eq('id', entry_id), 'delete')
+        _cache.invalidate()
+
+
+class KickWaxAnalytics:
+    """Kick wax statistics, aggregated in Postgres.
+
+    Uses the views and RPC functions of `supabase/migrations`, so only the
+    aggregated rows are transferred. The weather of an entry is looked up
+    once when it is added (`store_conditions`), entries added elsewhere or
+    whose lookup failed are caught up by `backfill` in the precompute job.
+    Failed lookups are recorded and retried once a day at most. Results are
+    cached together with the repository queries and dropped whenever an
+    entry changes.
+    """
+
+    DIMENSIONS = ['brand', 'application', 'combination']
+
+    def __init__(self, client: Client, weather: Callable[[str, dt.date], pd.DataFrame]):
+        self.client = client
+        self.weather = weather
+
+    def success_by(self, dimension: str) -> pd.DataFrame:
+        """Entries and mean success rate per `dimension` (one of `DIMENSIONS`)."""
+        def load():
+            response = _execute(self.client.rpc('kickwax_success_by', {'dimension': dimension}), 'success_by')
+            return pd.DataFrame(response.data, columns=['key', 'entries', 'success_rate'])
+        return _cache.get(('analytics', 'success_by', dimension), load).copy()
+
+    def at_conditions(self, temp: float, humidity: float, temp_tolerance: float = 2,
+                      humidity_tolerance: float = 10, top: int = 10) -> pd.DataFrame:
+        """Best layer combinations of entries with similar temperature and humidity."""
+        params = {'temp': temp, 'humidity': humidity, 'temp_tolerance': temp_tolerance,
+                  'humidity_tolerance': humidity_tolerance, 'top': top}
+        def load():
+            response = _execute(self.client.rpc('kickwax_at_conditions', params), 'at_conditions')
+            return pd.DataFrame(response.data, columns=['combination', 'entries', 'success_rate'])
+        return _cache.get(('analytics', 'at_conditions', *params.values()), load).copy()
+
+    def store_conditions(self, entry_id: int, location: str, date: dt.date) -> bool:
+        """Looks up and stores the weather of an entry, returns `False` if the lookup failed."""
+        try:
+            conditions = daytime_conditions(self.weather(location, date))
+        except (RequestException, ValueError, KeyError) as e:
+            LOGGER.warning('Could not look up weather of kick wax entry %s: %s', entry_id, e)
+            self._rpc('kickwax_conditions_failed', {'entry_id': entry_id})
+            return False
+        if not self._rpc('kickwax_set_conditions', {'entry_id': entry_id, **conditions}):
+            return False
+        _cache.invalidate()
+        return True
+
+    def backfill(self, max_rows: int = 20) -> int:
+        """Stores the weather of up to `max_rows` entries without conditions, returns the number stored.
+
+        Needs the service role, users may only set the conditions of their own entries.
+        """
+        missing = _execute(self.client.rpc('kickwax_without_conditions', {'max_rows': max_rows}), 'without_conditions').data
+        return sum(self.store_conditions(row['id'], row['location'], dt.date.fromisoformat(row['date'])) for row in missing)
+
+    def _rpc(self, name: str, params: dict) -> bool:
+        # e.g. migration not applied or permission denied, the entry itself is stored already
+        try:
+            _execute(self.client.rpc(name, params), name.removeprefix('kickwax_'))
+            return True
+        except APIError as e:
+            LOGGER.warning('Could not call %s for kick wax entry %s: %s', name, params['entry_id'], e)
+            return False
+
+
+def daytime_conditions(weather: pd.DataFrame) -> dict[str, float | str | None]:
+    """Mean temperature, humidity and snow fall and the most frequent conditions during `DAYTIME`."""
+    day = weather[(weather.index.hour >= DAYTIME[0]) & (weather.index.hour <= DAYTIME[1])]
+    if day.empty:
+        day = weather
+    def mean(column: str) -> float | None:
+        value = day[column].mean() if column in day else None
+        return None if value is None or pd.isna(value) else round(float(value), 1)
+    conditions = day['conditions'].mode() if 'conditions' in day else pd.Series(dtype=object)
+    return {
+        'temp': mean('temp'),
+        'humidity': mean('humidity'),
+        'snow': mean('snow'),
+        'conditions': None if conditions.empty else str(conditions.iloc[0]),
+    }
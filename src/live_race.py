@@ -0,0 +1,46 @@
+import threading
+import time
+from typing import Callable
+from streamlit.logger import get_logger
+from race_matrix import RaceMatrix
+
+
+LOGGER = get_logger(__name__)
+
+
+class LiveRace:
+    """Split times of a running race, shared by all sessions following it.
+
+    `poll` reloads the results at most every `interval` seconds, no matter how
+    many sessions call it, and merges them into the current matrix: new
+    skiers are appended and only new or changed rows are recomputed (see
+    `RaceMatrix.merge`). `version` is increased on every change, so the
+    sessions can key their caches by it.
+    """
+
+    def __init__(self, load: Callable[[], RaceMatrix], interval: float = 30):
+        self.load = load
+        self.interval = interval
+        self.version = 0
+        self.updated: float | None = None
+        self._matrix: RaceMatrix | None = None
+        self._checked = float('-inf')
+        self._lock = threading.Lock()
+
+    def poll(self) -> tuple[int, RaceMatrix]:
+        """Version and matrix of the latest results."""
+        with self._lock:
+            if self._matrix is None or time.monotonic() - self._checked >= self.interval:
+                # the other sessions wait for this load instead of starting their own
+                self._checked = time.monotonic()
+                self._update(self.load())
+            return self.version, self._matrix
+
+    def _update(self, latest: RaceMatrix):
+        first = self._matrix is None
+        merged, changed = (latest, range(len(latest.skiers))) if first else self._matrix.merge(latest)
+        if first or len(changed):
+            self._matrix = merged
+            self.version += 1
+            self.updated = time.time()
+            LOGGER.info('Live race version %d, %d new or changed skiers', self.version, len(changed))
@@ -0,0 +1,146 @@
+import jwt
+import os
+import streamlit as st
+import time
+
+from typing import Callable
+from auth import TokenVerifier, user_from_claims
+from member_data import get_active_member
+from gotrue.types import User, SignUpWithEmailAndPasswordCredentials
+from metrics import METRICS
+from pydantic_settings import BaseSettings
+from streamlit.logger import get_logger
+from supabase import create_client, Client, AuthApiError, AuthWeakPasswordError
+from webling.members import Member
+
+
+LOGGER = get_logger(__name__)
+
+
+class SupaBaseConfig(BaseSettings):
+    url: str = ''
+    key: str = ''
+    email: str = ''
+    password: str = ''
+    jwtSecret: str = ''
+    # service role key of the precompute job, bypasses row level security
+    serviceKey: str = ''
+
+    class Config:
+        env_file = '.env'
+        env_prefix = 'SUPABASE_'
+
+supabase_cfg = SupaBaseConfig()
+
+@st.cache_resource
+def get_shared_supabase_client() -> Client:
+    """Client shared by all sessions which are not logged in with their own account.
+
+    Raises if the sign-in with the configured account fails, so the failure
+    is not cached and the next session tries again.
+    """
+    client = create_client(supabase_cfg.url, supabase_cfg.key)
+    if supabase_cfg.email and supabase_cfg.password:
+        with METRICS.timer('outbound_request_seconds', dependency='supabase', operation='sign_in'):
+            client.auth.sign_in_with_password({
+                "email": supabase_cfg.email,
+                "password": supabase_cfg.password
+            })
+    return client
+
+@st.cache_resource
+def get_token_verifier() -> TokenVerifier:
+    return TokenVerifier(supabase_cfg.url, supabase_cfg.jwtSecret)
+
+class LoginHandler:
+    supabase_client: Client
+    authorized_user: User | None
+
+    def __init__(self):
+        if not supabase_cfg.url or not supabase_cfg.key:
+            st.error('SUPABASE_URL or SUPABASE_KEY not set')
+            st.stop()
+        try:
+            self.supabase_client = get_shared_supabase_client()
+        except Exception as e:
+            # anonymous for this session only
+            LOGGER.warning('Could not sign in the shared Supabase client: %s', e)
+            self.supabase_client = create_client(supabase_cfg.url, supabase_cfg.key)
+        self.authorized_user = None
+        self._token: str | None = None
+        self._expires_at = 0
+        self._member: Member | None = None
+
+    def set_authorized_user(self):
+        # the session is kept locally, it only hits the network to refresh an expiring token
+        session = self.supabase_client.auth.get_session()
+        if not session:
+            self.authorized_user, self._token, self._member = None, None, None
+            return
+        if session.access_token == self._token and time.time() < self._expires_at:
+            return
+        try:
+            claims = get_token_verifier().verify(session.access_token)
+            user, expires_at = user_from_claims(claims), claims['exp']
+        except jwt.InvalidTokenError:
+            with METRICS.timer('outbound_request_seconds', dependency='supabase', operation='get_user'):
+                user_response = self.supabase_client.auth.get_user(session.access_token)
+            user, expires_at = (user_response.user if user_response else None), session.expires_at or 0
+        self.authorized_user, self._token, self._expires_at, self._member = user, session.access_token, expires_at, None
+
+    def get_authorized_user(self) -> User | None:
+        return self.authorized_user
+
+    def get_member(self) -> Member:
+        """Webling member of the authorized user, cached until the access token changes."""
+        if self._member is None and self.authorized_user and self.authorized_user.email:
+            self._member = get_active_member(self.authorized_user.email)
+        return self._member
+
+    def is_logged_in(self) -> bool:
+        return self.authorized_user is not None
+    
+    def login(self, email: str, password: str):
+        def login_func():
+            member = get_active_member(email)
+            # sessions with their own account get their own client
+            client = create_client(supabase_cfg.url, supabase_cfg.key)
+            with METRICS.timer('outbound_request_seconds', dependency='supabase', operation='sign_in'):
+                response = client.auth.sign_in_with_password({
+                    "email": email,
+                    "password": password
+                })
+            self.supabase_client = client
+            st.success("Logged in successfully.")
+            self.set_authorized_user()
+            st.rerun()
+        self._handle_action(login_func)
+    
+    def signup(self, email: str, password: str):
+        def signup_func():
+            member = get_active_member(email)
+            app_url = os.getenv("APP_URL")
+            if not app_url:
+                st.error("APP_URL not set")
+                st.stop()
+            body = SignUpWithEmailAndPasswordCredentials(
+                email=email,
+                password=password,
+                options={
+                    "email_redirect_to": app_url + "/Supabase"
+                }
+            )
+            with METRICS.timer('outbound_request_seconds', dependency='supabase', operation='sign_up'):
+                response = create_client(supabase_cfg.url, supabase_cfg.key).auth.sign_up(body)
+            if response.user and response.user.identities and len(response.user.identities) > 0:
+                st.success("User created successfully. Please check your email for a verification link.")
+            else:
+                st.warning("User already exists. Please log in.")
+        self._handle_action(signup_func)
+    
+    def _handle_action(self, func: Callable[[], None]):
+        try:
+            func()
+        except (AuthWeakPasswordError, AuthApiError) as e:
+            st.error(e)
+            st.stop()
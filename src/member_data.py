@@ -0,0 +1,86 @@
+import datetime as dt
+import streamlit as st
+
+from functools import cache
+from pydantic_settings import BaseSettings
+import member_stats
+from data import artifacts, artifacts_cfg
+from models.year_stats import YearStats
+from resource_registry import RESOURCES_PATH
+from stats_history import YearStatsHistory
+from utils import CACHE_PATH
+from webling.client import WeblingClient
+from webling.members import Member
+from webling.sync import WeblingMirror
+
+
+class WeblingConfig(BaseSettings):
+    apiUrl: str = 'https://zuerichdoppelstock.webling.ch/api/1'
+    apiKey: str = ''
+    timeout: float = 10.0
+    mirrorPath: str = str(CACHE_PATH / 'webling.sqlite')
+    syncInterval: int = 300
+    statsDir: str = str(CACHE_PATH)
+    # latest statistics, the tracked copy is shown until the members are loaded the first time
+    statsFile: str = str(RESOURCES_PATH / 'year_stats.json')
+
+    class Config:
+        env_file = '.env'
+        env_prefix = 'WEBLING_'
+
+
+cfg = WeblingConfig()
+
+
+@cache
+def get_webling_client() -> WeblingClient:
+    return WeblingClient(cfg.apiUrl, cfg.apiKey, timeout=cfg.timeout)
+
+
+@cache
+def webling_mirror() -> WeblingMirror:
+    """The mirror of this process, created on first use."""
+    return WeblingMirror(get_webling_client(), cfg.mirrorPath)
+
+
+def get_webling_mirror() -> WeblingMirror:
+    """The mirror, kept in sync by a background thread."""
+    mirror = webling_mirror()
+    mirror.start(cfg.syncInterval)
+    return mirror
+
+
+@cache
+def get_stats_history() -> YearStatsHistory:
+    return YearStatsHistory(f'{cfg.statsDir}/year_stats_history.jsonl', cfg.statsFile)
+
+
+def get_active_member(email: str) -> Member:
+    mirror = get_webling_mirror()
+    member = mirror.active_member(email)
+    if not member:
+        # the member might have been added since the last background sync
+        mirror.sync()
+        member = mirror.active_member(email)
+    if not member:
+        st.error(f"No active member found in Webling with email {email}.")
+        st.stop()
+    return member
+
+
+def load_year_stats() -> tuple[list[YearStats], dt.datetime] | None:
+    """Year stats of the precompute job and when they were computed, if recent enough."""
+    artifact = artifacts.latest('year_stats', max_age=artifacts_cfg.maxAge)
+    if artifact is None:
+        return None
+    return [YearStats(**stat) for stat in artifact.json()], dt.datetime.fromtimestamp(artifact.created)
+
+
+def refresh_year_stats() -> list[YearStats]:
+    """Syncs the Webling mirror, then stores and publishes the year stats of its members."""
+    mirror = webling_mirror()
+    mirror.sync()
+    year_stats = member_stats.year_stats(mirror.member_table(), member_stats.stats_years())
+    artifacts.publish_json('year_stats', [stat.model_dump() for stat in year_stats])
+    get_stats_history().save(year_stats)
+    return year_stats
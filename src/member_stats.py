@@ -0,0 +1,94 @@
+from datetime import date
+from typing import Sequence
+import numpy as np
+import pandas as pd
+from models.year_stats import YearStats
+from webling.members import Member, Status
+from webling.tables import OPEN_END, MemberTable
+
+
+# first year of the member statistics
+FIRST_YEAR = 2016
+
+
+def stats_years() -> list[int]:
+    return list(range(FIRST_YEAR, date.today().year + 1))
+
+
+def member_arrays(members: Sequence[Member] | MemberTable) -> dict[str, np.ndarray]:
+    """Column arrays of the fields the yearly statistics are based on."""
+    if isinstance(members, MemberTable):
+        return {
+            'start': members.start_year.astype(np.int32),
+            'end': members.end_year.astype(np.int32),
+            'aspirant': members.has_status(Status.Aspirant),
+            'talent': members.talent,
+            'heart_rate': members.heart_rate,
+        }
+    return {
+        'start': np.fromiter((m.start.year for m in members), dtype=np.int32, count=len(members)),
+        'end': np.fromiter((m.end.year if m.end else OPEN_END for m in members), dtype=np.int32, count=len(members)),
+        'aspirant': np.fromiter((m.status == Status.Aspirant for m in members), dtype=bool, count=len(members)),
+        'talent': np.fromiter((m.talent for m in members), dtype=bool, count=len(members)),
+        'heart_rate': np.fromiter((m.heart_rate for m in members), dtype=np.int32, count=len(members)),
+    }
+
+
+def year_stats(members: Sequence[Member] | MemberTable | dict[str, np.ndarray], years: Sequence[int]) -> list[YearStats]:
+    """All `YearStats` of consecutive `years` in one interval sweep.
+
+    A member is active from its start year up to (excluding) its end year,
+    aspirants are never active and never count as joined. Active intervals are
+    added to difference arrays, whose cumulative sums are the yearly counts.
+    """
+    arrays = members if isinstance(members, dict) else member_arrays(members)
+    first, n = years[0], len(years)
+    start, end = arrays['start'], arrays['end']
+    eligible = ~arrays['aspirant']
+
+    # active interval [start, end) clipped to the requested years
+    lo = np.clip(start.astype(np.int64) - first, 0, n)
+    hi = np.clip(end.astype(np.int64) - first, 0, n)
+    active = eligible & (lo < hi)
+
+    def sweep(mask: np.ndarray) -> np.ndarray:
+        diff = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(diff, lo[mask], 1)
+        np.add.at(diff, hi[mask], -1)
+        return np.cumsum(diff[:-1])
+
+    def count(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        offset = values.astype(np.int64) - first
+        mask = mask & (offset >= 0) & (offset < n)
+        return np.bincount(offset[mask], minlength=n)
+
+    members_count = sweep(active & ~arrays['talent'])
+    talent_count = sweep(active & arrays['talent'])
+    new_count = count(start, eligible)
+    left_count = count(end, end != OPEN_END)
+
+    # one (year, heart rate) pair per active member and year, in member order within a year
+    rated = np.flatnonzero(active & (arrays['heart_rate'] != 0))
+    lengths = hi[rated] - lo[rated]
+    owner = np.repeat(rated, lengths)
+    year = np.repeat(lo[rated], lengths) + np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    order = np.argsort(year, kind='stable')
+    rates = np.split(arrays['heart_rate'][owner[order]], np.cumsum(np.bincount(year, minlength=n))[:-1])
+
+    return [
+        YearStats(
+            year=y,
+            active_members=int(members_count[i]),
+            talent_members=int(talent_count[i]),
+            new_members=int(new_count[i]),
+            left_members=int(left_count[i]),
+            heart_rates=rates[i].tolist())
+        for i, y in enumerate(years)]
+
+
+def heart_rate_frame(stats: Sequence[YearStats]) -> pd.DataFrame:
+    """Long format heart rates (`year`, `heart_rate`) of all active members."""
+    return pd.DataFrame({
+        'year': np.repeat([s.year for s in stats], [len(s.heart_rates) for s in stats]),
+        'heart_rate': np.concatenate([s.heart_rates for s in stats] or [[]]).astype(np.int64),
+    })
@@ -0,0 +1,143 @@
+import math
+import pathlib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+import numpy as np
+from streamlit.logger import get_logger
+from atomic_file import atomic_path
+
+
+LOGGER = get_logger(__name__)
+
+# latency histogram buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class _Histogram:
+
+    def __init__(self, samples: int):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque[float] = deque(maxlen=samples)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+
+class Metrics:
+    """Process-wide latency histograms and counters.
+
+    Timings are kept as Prometheus style cumulative histograms plus the last
+    `samples` observations of every series, from which `percentiles` are
+    computed. `prometheus` renders everything in the Prometheus text format,
+    `export` writes it to a file (e.g. for the node exporter's textfile
+    collector) at most every `interval` seconds.
+    """
+
+    def __init__(self, samples: int = 1000):
+        self.samples = samples
+        self._histograms: dict[tuple[str, Labels], _Histogram] = {}
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+        self._path: pathlib.Path | None = None
+        self._interval = 15.0
+        self._exported = 0.0
+
+    def configure(self, path: str | pathlib.Path | None, interval: float = 15.0):
+        self._path = pathlib.Path(path) if path else None
+        self._interval = interval
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.samples)
+            histogram.observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observes the duration of the block, with an `outcome` label of `ok` or `error`."""
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'ok'
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels, outcome=outcome)
+
+    def percentiles(self, name: str, q: tuple[float, ...] = (50, 90, 99)) -> list[dict[str, float | int | str]]:
+        """One row per series of `name` with its labels, count and latency percentiles in ms."""
+        with self._lock:
+            series = [(labels, h.count, list(h.recent)) for (n, labels), h in self._histograms.items() if n == name]
+        rows = []
+        for labels, count, recent in sorted(series):
+            values = np.percentile(recent, q) * 1000 if recent else [math.nan] * len(q)
+            rows.append({**dict(labels), 'count': count, **{f'p{p:g} [ms]': round(float(v), 1) for p, v in zip(q, values)}})
+        return rows
+
+    def counters(self, name: str) -> list[dict[str, float | str]]:
+        with self._lock:
+            return [{**dict(labels), 'value': value} for (n, labels), value in sorted(self._counters.items()) if n == name]
+
+    def prometheus(self) -> str:
+        with self._lock:
+            histograms = sorted((key, h.buckets[:], h.count, h.sum) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        for name in dict.fromkeys(key[0] for key, *_ in histograms):
+            lines.append(f'# TYPE {name} histogram')
+            for (n, labels), buckets, count, total in histograms:
+                if n != name:
+                    continue
+                for bound, value in zip(BUCKETS, buckets):
+                    lines.append(f'{name}_bucket{_format(labels + (("le", f"{bound:g}"),))} {value}')
+                lines.append(f'{name}_bucket{_format(labels + (("le", "+Inf"),))} {count}')
+                lines.append(f'{name}_sum{_format(labels)} {total:.6f}')
+                lines.append(f'{name}_count{_format(labels)} {count}')
+        for name in dict.fromkeys(key[0] for key, _ in counters):
+            lines.append(f'# TYPE {name} counter')
+            lines.extend(f'{name}{_format(labels)} {value:g}' for (n, labels), value in counters if n == name)
+        return '\n'.join(lines) + '\n'
+
+    def export(self, force: bool = False):
+        """Writes the metrics file, if configured and the last export is older than the interval."""
+        if self._path is None or (not force and time.monotonic() - self._exported < self._interval):
+            return
+        self._exported = time.monotonic()
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_path(self._path) as tmp:
+                tmp.write_text(self.prometheus())
+        except OSError as e:
+            LOGGER.warning('Could not write metrics to %s: %s', self._path, e)
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
+
+
+METRICS = Metrics()
@@ -0,0 +1,30 @@
+import datetime as dt
+from pydantic import BaseModel
+
+
+class Checkpoint(BaseModel):
+    name: str
+    distance: float
+    coordinates: tuple[float, float, float]
+
+    def __hash__(self):
+        return hash((self.coordinates[0], self.coordinates[1]))
+
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return self.__hash__() == other.__hash__()
+        return NotImplemented
+
+    @property
+    def location(self) -> str:
+        return f'{self.coordinates[0]},{self.coordinates[1]}'
+
+
+class Race(BaseModel):
+    name: str
+    start: dt.datetime
+    distance: float
+    checkpoints: list[Checkpoint]
+
+    def __str__(self):
+        return self.name
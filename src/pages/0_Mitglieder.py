@@ -1,28 +1,26 @@
-from datetime import date, datetime
-import json
+from datetime import datetime
 import pandas as pd
-import pathlib
 import plotly.express as px
 import streamlit as st
 from streamlit.logger import get_logger
 
-from data import get_call
+from member_data import get_stats_history, get_webling_mirror, load_year_stats, refresh_year_stats
+import member_stats
 from models.year_stats import YearStats
 from utils import page_config
-from webling.members import Member
+from webling.tables import MemberTable
 
 
 LOGGER = get_logger(__name__)
 
-def get_members() -> list[Member]:
-    data = get_call('member', {'format': 'full'}).json()
-    members = [Member(**member) for member in data]
+def get_members() -> MemberTable:
+    members = get_webling_mirror().member_table()
     LOGGER.info('Loaded %d members from Webling' % len(members))
     return members
 
 
 def cat_bar_plot(title: str, x_label: str, x_values: list, y_label: str, category: str,
-             cat_labels: list[str], cat_values: list[list], cat_colors: list[str]):
+             cat_labels: list[str], cat_values: list[list], cat_colors: list[str], key: str | None = None):
     data = {x_label: x_values}
     data.update({k: v for k,v in zip(cat_labels, cat_values)})
     df = pd.DataFrame(data).melt(x_label, var_name=category, value_name=y_label)
@@ -33,78 +31,90 @@ def cat_bar_plot(title: str, x_label: str, x_values: list, y_label: str, categor
         color_discrete_map={cat: color for cat, color in zip(cat_labels, cat_colors)},
         category_orders={category: cat_labels})
     fig.update_layout(xaxis={'type': 'category'}, legend_title=category)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def render(year_stats: list[YearStats], key: str):
+    years = [stat.year for stat in year_stats]
+
+    # PLOT NUMBER OF ACTIVE MEMBERS
+    m_count = [stat.active_members for stat in year_stats]
+    t_count = [stat.talent_members for stat in year_stats]
+
+    cat_bar_plot('Anzahl Mitglieder im Verlauf der Zeit', 'Jahr', years, 'Anzahl', 'Mitglieder',
+             ['Talenterhaltung', 'Talentförderung'], [m_count, t_count], ['lightgrey', 'grey'], key=f'{key}_members')
+
+    # PLOT MEMBERSHIP CHANGES PER YEAR 
+    n_count = [stat.new_members for stat in year_stats]
+    a_count = [stat.left_members for stat in year_stats]
+
+    cat_bar_plot('Anzahl Neuzugänge und -abgänge pro Jahr', 'Jahr', years, 'Anzahl', 'Ereignis',
+             ['Eintritte', 'Austritte'], [n_count, a_count], ['lightgreen', 'orange'], key=f'{key}_changes')
+
+    heart_rates = member_stats.heart_rate_frame(year_stats)
+
+    # PLOT HEART RATE DISTRIBUTION PER YEAR
+    fig = px.box(heart_rates, y='heart_rate', x='year')
+    fig.update_layout(
+        title='Verteilung der Ruhepulse pro Jahr',
+        yaxis_title='Ruhepuls',
+        xaxis_title='Jahr'
+    )
+    # Add median line to heart rate plot
+    median_data = heart_rates.groupby('year')['heart_rate'].median().reset_index()
+    fig.add_scatter(x=median_data['year'], y=median_data['heart_rate'], 
+                   mode='lines', name='Median', line=dict(color='red'))
+    st.plotly_chart(fig, use_container_width=True, key=f'{key}_heart_rates')
+
+
+def reload_members():
+    # runs before the rerun, which then renders the recomputed stats
+    refresh_year_stats()
+    st.session_state['members_reloaded'] = datetime.now()
+
+
+def reload_button():
+    st.button("re-load data", on_click=reload_members)
+    reloaded = st.session_state.pop('members_reloaded', None)
+    if reloaded:
+        st.info('Loaded the members from Webling (%s)' % reloaded.strftime('%H:%M:%S'))
 
 
 page_config()
 
 st.title("Vereinsmitglieder Statistik")
-st.write("Die Daten werden anonymisiert von Webling geladen und in der App verarbeitet.")
-st.write("Die Daten werden nicht gespeichert oder weiterverarbeitet.")
+st.write("Die Mitgliederdaten werden von Webling geladen und auf dem Server der App in einer lokalen Kopie "
+         "gespeichert, die regelmässig mit Webling abgeglichen wird.")
+st.write("Angezeigt werden nur anonyme Auswertungen über alle Mitglieder.")
+
+precomputed = load_year_stats()
+if precomputed:
+    # computed by the precompute job, the members need not be loaded
+    year_stats, computed = precomputed
+    render(year_stats, 'precomputed')
+    st.caption(f'Stand {computed:%d.%m.%Y %H:%M}')
+    reload_button()
+    st.stop()
+
+# render the latest snapshot right away, it is replaced once the members are loaded
+charts = st.empty()
+snapshot = get_stats_history().latest()
+if snapshot:
+    with charts.container():
+        render(snapshot, 'snapshot')
 
 LOGGER.info('Loading members')
 members = get_members()
 
 LOGGER.info('Creating charts')
-years = list(range(2016, date.today().year + 1))
-
-
-# PLOT NUMBER OF ACTIVE MEMBERS
-m_count = [len([member for member in members if member.is_active(year) and not member.talent]) for year in years]
-t_count = [len([member for member in members if member.is_active(year) and member.talent]) for year in years]
-
-cat_bar_plot('Anzahl Mitglieder im Verlauf der Zeit', 'Jahr', years, 'Anzahl', 'Mitglieder',
-         ['Talenterhaltung', 'Talentförderung'], [m_count, t_count], ['lightgrey', 'grey'])
-
-# PLOT MEMBERSHIP CHANGES PER YEAR 
-n_count = [len([member for member in members if member.joined(year)]) for year in years]
-a_count = [len([member for member in members if member.left(year)]) for year in years]
-
-cat_bar_plot('Anzahl Neuzugänge und -abgänge pro Jahr', 'Jahr', years, 'Anzahl', 'Ereignis',
-         ['Eintritte', 'Austritte'], [n_count, a_count], ['lightgreen', 'orange'])
-
-# Create pivot table data
-heart_rate_data = []
-for year in years:
-    rates = [member.heart_rate for member in members if member.is_active(year) and member.heart_rate != 0]
-    for rate in rates:
-        heart_rate_data.append({'year': year, 'heart_rate': rate})
-heart_rates = pd.DataFrame(heart_rate_data)
-
-# PLOT HEART RATE DISTRIBUTION PER YEAR
-fig = px.box(heart_rates, y='heart_rate', x='year')
-fig.update_layout(
-    title='Verteilung der Ruhepulse pro Jahr',
-    yaxis_title='Ruhepuls',
-    xaxis_title='Jahr'
-)
-# Add median line to heart rate plot
-median_data = heart_rates.groupby('year')['heart_rate'].median().reset_index()
-fig.add_scatter(x=median_data['year'], y=median_data['heart_rate'], 
-               mode='lines', name='Median', line=dict(color='red'))
-st.plotly_chart(fig, use_container_width=True)
-
-
-# dump year stats
-year_stats = []
-for year, m_count, t_count, n_count, a_count in zip(years, m_count, t_count, n_count, a_count):
-    rates = heart_rates[heart_rates['year'] == year]['heart_rate']
-    rates = [int(rate) for rate in rates]
-    year_stats.append(
-        YearStats(
-            year=year,
-            active_members=m_count,
-            talent_members=t_count,
-            new_members=n_count,
-            left_members=a_count,
-            heart_rates=rates))
-# Write year stats to JSON file
-history_file = pathlib.Path(__file__).resolve().parent.parent / 'resources' / 'year_stats.json'
-with open(history_file, 'w') as f:
-    json_data = [stat.model_dump() for stat in year_stats]
-    json.dump(json_data, f, indent=2)
-
-
-if st.button("re-load data"):
-    members = get_members()
-    st.info('Loaded %d members from Webling (%s)' % (len(members), datetime.now().strftime('%H:%M:%S')))
+years = member_stats.stats_years()
+year_stats = member_stats.year_stats(members, years)
+if year_stats != snapshot:
+    with charts.container():
+        render(year_stats, 'current')
+
+# store year stats, only writes if they changed
+if get_stats_history().save(year_stats):
+    LOGGER.info('Stored new year stats version')
+
+reload_button()
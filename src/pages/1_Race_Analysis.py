@@ -1,19 +1,82 @@
-import pandas as pd
+import datetime as dt
+import hashlib
+import json
 import streamlit as st
 from utils import page_config
-from data import get_google_sheet
-from race_plots import RACE_PLOTS, add_seedings
-from races import RACES
+from race_data import get_live_race, get_result_store, load_seeded_race, load_skier_labels, seedings_hash, sheets_cfg
+from race_matrix import RaceMatrix
+from race_plots import RACE_PLOTS, make_skier_pacing
+from races import load_races
+from seedings import seed_matrix
+from skier_search import TOP_K, SkierIndex
 from streamlit.logger import get_logger
 
 
 LOGGER = get_logger(__name__)
 
+
+@st.cache_resource(ttl=sheets_cfg.ttl, max_entries=16)
+def load_race(name: str, version: str | None, seedings: dict[str, dict[str, dt.timedelta]]) -> RaceMatrix:
+    # add average skier for each seeding time, reloaded whenever the results are ingested again
+    return load_seeded_race(get_result_store(), name, seedings)
+
+
+@st.cache_resource(max_entries=16)
+def load_live_race(name: str, version: int, seedings: dict[str, dict[str, dt.timedelta]], _matrix: RaceMatrix) -> RaceMatrix:
+    # seeded once per version for all sessions, the live matrix carries its derived rows over
+    return seed_matrix(_matrix, seedings)
+
+
+@st.cache_resource(ttl=sheets_cfg.ttl, max_entries=16, show_spinner=False)
+def skier_index(name: str | None, version: str | None, _skiers: list[str]) -> SkierIndex:
+    # built once per race version, `name` is None for the skiers of all races
+    race = next((race for race in load_races() if race.name == name), None)
+    labels = load_skier_labels(race) if race else None
+    if labels is not None:
+        labels = labels[~labels.index.duplicated()].reindex(_skiers)
+    return SkierIndex(_skiers, labels)
+
+
+def search_options(index: SkierIndex, key: str, selected: list[str]) -> list[str]:
+    """Search box, returns the selected skiers followed by the best matches.
+
+    Only these options are sent to the browser instead of the whole field.
+    """
+    query = st.sidebar.text_input('Search skiers', key=f'{key}_query', help=f'Shows the best {TOP_K} of {len(index)} skiers')
+    return selected + [skier for skier in index.search(query) if skier not in selected]
+
+
+@st.cache_data(ttl=sheets_cfg.ttl, max_entries=128, show_spinner=False)
+def figure_json(race_name: str, version: str | None, seedings: str, plot_name: str, selection_hash: str,
+                _selection: RaceMatrix) -> str:
+    # the selection itself is not hashed, it is identified by race, version, seedings and selection hash
+    plot = next(p for p in RACE_PLOTS if p.name == plot_name)
+    return plot.figure_json(_selection)
+
+
 page_config()
 st.sidebar.title('Configuaration')
+store = get_result_store()
+
+view = st.sidebar.radio('View', ['Race', 'Skier across races'])
+if view == 'Skier across races':
+    st.title('Skier across races')
+    skiers = store.skiers()
+    versions = hashlib.sha1('\n'.join(f'{race}={store.version(race)}' for race in store.races()).encode()).hexdigest()
+    selected = st.session_state.get('skier')
+    options = search_options(skier_index(None, versions, skiers), 'skier', [selected] if selected else [])
+    skier = st.sidebar.selectbox('Select a skier', options, index=None, key='skier')
+    if skier is None:
+        st.write('Please select a skier')
+        st.stop()
+    results = store.skier_results(skier)
+    st.plotly_chart(make_skier_pacing(results), use_container_width=True)
+    finish = results.sort_values('km').groupby('race').last()['elapsed']
+    st.dataframe(finish.rename('race time'), use_container_width=True)
+    st.stop()
 
 # race selection
-race = st.sidebar.selectbox('Select a race', RACES)
+race = st.sidebar.selectbox('Select a race', load_races())
 if race is None:
     st.write('Please select a race first')
     st.stop()
@@ -21,27 +84,50 @@ st.title(race.name)
 st.write(f'{race.location}, {race.date.strftime("%d.%m.%Y")}, {race.url}, {race.distance} km')
 st.write('---')
 
-# load data
-df_raw = get_google_sheet(race.doc_id, race.sheet_id)
-df_raw = df_raw.set_index('skier')
-df_raw = df_raw.apply(pd.to_datetime, format='%H:%M:%S')
-
-# add average skier for each seeding time
-df_seed = add_seedings(df_raw, race.seedings)
+# load data, including the average skier for each seeding time
+live = st.sidebar.toggle('Live', help=f'Follow the race, the results are reloaded every {sheets_cfg.liveInterval} s')
+if live:
+    live_version, live_matrix = get_live_race(race.name).poll()
+    race_matrix = load_live_race(race.name, live_version, race.seedings, live_matrix)
+elif race.name not in store.races():
+    st.error(f'Results of {race.name} could not be loaded')
+    st.stop()
+else:
+    # read once, the race, its search index and figures are all cached under this version
+    version = store.version(race.name)
+    race_matrix = load_race(race.name, version, race.seedings)
 
 # skiers selection
-selected_skiers = st.sidebar.multiselect('Select skiers', df_seed.index)
+index = skier_index(race.name, f'live-{live_version}' if live else version, list(race_matrix.skiers))
+key = f'skiers_{race.name}'
+options = search_options(index, key, st.session_state.get(key, []))
+selected_skiers = st.sidebar.multiselect('Select skiers', options, key=key)
 if selected_skiers == []:
     st.write('Please select skiers')
     st.stop()
-filtered_df = df_seed.loc[selected_skiers]
 
 # select a plot type and pre-process the data
 plot = st.sidebar.selectbox('Select a plot type', RACE_PLOTS)
 if plot is None:
     st.stop()
-
-# Display the line plot for the selected skiers
-fig = plot.make_figure(filtered_df)
 st.write(plot.explanation)
-st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+
+
+@st.fragment(run_every=sheets_cfg.liveInterval if live else None)
+def chart(race_matrix: RaceMatrix, version: str | None):
+    if live:
+        # only this fragment reruns, new skiers show up in the skier selection after the next full rerun
+        live_race = get_live_race(race.name)
+        live_version, live_matrix = live_race.poll()
+        version = f'live-{live_version}'
+        race_matrix = load_live_race(race.name, live_version, race.seedings, live_matrix)
+        if live_race.updated:
+            st.caption(f'Updated {dt.datetime.fromtimestamp(live_race.updated):%H:%M:%S}')
+    skiers = [skier for skier in selected_skiers if skier in race_matrix.skiers]
+    selection_hash = hashlib.sha1('\n'.join(skiers).encode()).hexdigest()
+    fig = figure_json(race.name, version, seedings_hash(race.seedings), plot.name, selection_hash,
+                      race_matrix.select(skiers))
+    st.plotly_chart(json.loads(fig), use_container_width=True)
+
+
+chart(race_matrix, None if live else version)
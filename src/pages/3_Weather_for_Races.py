@@ -1,51 +1,19 @@
-import os
 import altair as alt
 import datetime as dt
-import pandas as pd
-from pydantic import BaseModel
 import streamlit as st
 from streamlit.logger import get_logger
-import yaml
-from data import load_forecast
+from weather_data import get_forecast_prewarmer, load_race_forecasts, load_weather_races
 from utils import page_config
+from weather.timeline import ForecastTimeline
 
 
 LOGGER = get_logger(__name__)
 LOGGER.setLevel('DEBUG')
-RESOURCES_PATH = 'src/resources/weather'
-DEBUG = False
 
 page_config()
 
-class Checkpoint(BaseModel):
-    name: str
-    distance: float
-    coordinates: tuple[float, float, float]
-
-    def __hash__(self):
-        return hash((self.coordinates[0], self.coordinates[1]))
-
-    def __eq__(self, other):
-        if other.__class__ is self.__class__:
-            return self.__hash__() == other.__hash__()
-        return NotImplemented
-
-class Race(BaseModel):
-    name: str
-    start: dt.datetime
-    distance: float
-    checkpoints: list[Checkpoint]
-
-    def __str__(self):
-        return self.name
-    
-
-with open(f'{RESOURCES_PATH}/races.yaml', 'r') as stream:
-    try:
-        races = yaml.safe_load(stream)
-        RACES = [Race(**r) for r in races]
-    except yaml.YAMLError as e:
-        print(e)
+RACES = load_weather_races()
+prewarmer = get_forecast_prewarmer()
 
 race = st.selectbox('Select your race', RACES, index=0)
 if not race:
@@ -57,27 +25,14 @@ st.write(f'{race}: {race.start}')
 # icons: https://github.com/visualcrossing/WeatherIcons/tree/main/PNG/2nd%20Set%20-%20Color
 cols = ['temp','feelslike','dew','humidity','precip','precipprob','preciptype','snow','snowdepth','windgust','windspeed','winddir','cloudcover','conditions','icon']
 cols_std = ['km', 'time']
-cache_file = f'{RESOURCES_PATH}/forecast.csv'
-if DEBUG and os.path.exists(cache_file):
-    forecast = pd.read_csv(cache_file, delimiter=',', index_col=0, parse_dates=True)
-else:
-    rows = []
-    for checkpoint in race.checkpoints:
-        cache_id = dt.datetime.now().hour
-        data = load_forecast(f'{checkpoint.coordinates[0]},{checkpoint.coordinates[1]}', cache_id)[cols]
-        t = race.start + dt.timedelta(hours=checkpoint.distance/race.distance*time.hour)
-        i = min(data.index, key=lambda d: abs(d - t))
-        row = data.loc[i]
-        row['name'] = checkpoint.name
-        row['km'] = checkpoint.distance
-        row['time'] = t.time()
-        rows.append(row)
-    forecast = pd.concat(rows, axis=1).transpose()
-    forecast.reset_index(inplace=True, drop=True)
-    forecast.set_index('name', inplace=True)
-    forecast = forecast[cols_std + cols]
-    forecast.to_csv(cache_file)
-    
+forecasts = load_race_forecasts(race)
+for checkpoint in race.checkpoints:
+    if forecasts[checkpoint] is None:
+        st.warning(f'No forecast available for {checkpoint.name}.')
+timeline = ForecastTimeline(race, forecasts, cols)
+race_time = dt.timedelta(hours=time.hour, minutes=time.minute)
+forecast = timeline.table(race_time)
+
 
 st.write('---')
 
@@ -93,4 +48,26 @@ with st.expander('temperatures (WIP)'):
         y=alt.Y('value', axis=alt.Axis(title='Temperature [°C]')),
         color='variable'
     )
-    st.altair_chart(chart, use_container_width=True)
\ No newline at end of file
+    st.altair_chart(chart, use_container_width=True)
+
+with st.expander('compare race times'):
+    hours = st.multiselect('Race times [h]', [h / 2 for h in range(2, 25)], default=[4.0, 6.0])
+    column = st.selectbox('Value', timeline.numeric, index=0)
+    if hours and column:
+        data = timeline.compare([dt.timedelta(hours=h) for h in hours], column)
+        chart = alt.Chart(data).mark_line(point=True).encode(
+            x=alt.X('km', axis=alt.Axis(title='Distance [km]')),
+            y=alt.Y(column, axis=alt.Axis(title=column)),
+            color='race time'
+        )
+        st.altair_chart(chart, use_container_width=True)
+
+with st.expander('forecast cache'):
+    st.write('last pre-fetch run:', prewarmer.last_run.strftime('%H:%M:%S') if prewarmer.last_run else 'never')
+    quota = prewarmer.client.quota
+    if quota:
+        st.write('forecast requests today:', f'{quota.used()} of {quota.limit}')
+    ages = [prewarmer.cache.age(checkpoint.location) for checkpoint in race.checkpoints]
+    st.dataframe({
+        'checkpoint': [checkpoint.name for checkpoint in race.checkpoints],
+        'age [min]': [None if age is None else round(age / 60) for age in ages]})
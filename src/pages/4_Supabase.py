@@ -1,10 +1,14 @@
 import streamlit as st
 import streamlit_react_jsonschema as srj
-import pandas as pd
 
-from data import get_active_member, LoginHandler
-from models.kick_wax import KickWaxEntry, KickWaxAdd
+import datetime as dt
+import math
+from weather_data import load_forecast, load_weather_day, load_weather_races
+from login import LoginHandler
+from kick_wax_repository import KickWaxAnalytics, KickWaxRepository
+from models.kick_wax import KickWaxAdd
 from pydantic import ValidationError
+from requests import RequestException
 
 
 if "login_handler" not in st.session_state:
@@ -36,7 +40,7 @@ def init():
             if not user:
                 st.error("No User logged in.")
                 st.stop()
-            member = get_active_member(user.email)
+            member = login_handler.get_member()
             if not member:
                 st.error("No active member found in Webling with email {user.user.email}.")
                 st.stop()
@@ -44,18 +48,21 @@ def init():
 
 # Main
 init()
-supabase = login_handler.supabase_client
+repository = KickWaxRepository(login_handler.supabase_client, login_handler.get_authorized_user().id)
+analytics = KickWaxAnalytics(login_handler.supabase_client, load_weather_day)
 
-# load data
-data = pd.DataFrame(supabase.table("kickwax").select("*").execute().data)
-data["mine"] = data["created_by"] == login_handler.get_authorized_user().id
+# load one page of entries, only the summary columns
+pages = max(1, -(-repository.count() // repository.page_size))
+page = 0
+if pages > 1:
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1) - 1
+summary = repository.page(page)
 
 # Select only relevant columns for display
 display_columns = ["date", "name", "location", "success_rate", "mine"]
-summary = data[display_columns]
 # display table
 table = st.dataframe(
-    summary,
+    summary[display_columns],
     use_container_width=True,
     hide_index=True,
     column_order=display_columns,
@@ -67,7 +74,7 @@ if not table.selection.rows:
     st.info("Select a row from the table.")
 else:
     selected_index = table.selection.rows[0]
-    entry = KickWaxEntry(**data.iloc[selected_index])
+    entry = repository.entry(summary.iloc[selected_index])
         
     # view
     st.subheader(f"Wax layers for {entry.name} on {entry.date}")
@@ -78,7 +85,7 @@ else:
     if entry.mine:
         with st.expander(f"Delete {entry}"):
             if st.button("Yes, delete", key="confirm_delete", type="primary"):
-                supabase.table("kickwax").delete().eq("id", entry.id).execute()
+                repository.delete(entry.id)
                 st.success("Deleted entry.")
                 st.rerun()
             if st.button("No, cancel", key="cancel_delete", type="secondary"):
@@ -90,7 +97,36 @@ with st.expander("Add new entry"):
     if submitted and value:
         try:
             obj = KickWaxAdd.model_validate(value)
-            supabase.table("kickwax").insert(obj.model_dump()).execute()
+            entry_id = repository.insert(obj)
             st.success(f"Added new entry {obj}")
+            # looked up once, failures are retried by the precompute job
+            if not analytics.store_conditions(entry_id, obj.location, obj.date):
+                st.warning("Could not look up the weather of the new entry, it will be added later.")
         except ValidationError as e:
-            st.error(e)
\ No newline at end of file
+            st.error(e)
+
+def slider_value(value: float, default: float, low: int, high: int) -> int:
+    """`value` rounded into the range of a slider, `default` if it is missing."""
+    return round(min(max(default if math.isnan(value) else value, low), high))
+
+
+# what worked at these conditions
+with st.expander("What worked at these conditions"):
+    temp, humidity = 0.0, 80.0
+    races = [race for race in load_weather_races() if race.start >= dt.datetime.now()]
+    race = st.selectbox("Conditions of race", [None] + races, format_func=lambda r: "manual" if r is None else r.name)
+    if race:
+        try:
+            forecast = load_forecast(race.checkpoints[0].location)
+            hour = forecast.iloc[forecast.index.get_indexer([race.start], method="nearest")[0]]
+            temp, humidity = float(hour["temp"]), float(hour["humidity"])
+        except (RequestException, ValueError, KeyError) as e:
+            st.warning(f"No forecast available for {race.name}: {e}")
+    col1, col2 = st.columns(2)
+    with col1:
+        temp = st.slider("Temperature [°C]", min_value=-25, max_value=15, value=slider_value(temp, 0, -25, 15))
+    with col2:
+        humidity = st.slider("Humidity [%]", min_value=0, max_value=100, value=slider_value(humidity, 80, 0, 100), step=5)
+    st.dataframe(analytics.at_conditions(temp, humidity), use_container_width=True, hide_index=True)
+    dimension = st.radio("Success rate by", KickWaxAnalytics.DIMENSIONS, horizontal=True)
+    st.bar_chart(analytics.success_by(dimension), x="key", y="success_rate", horizontal=True)
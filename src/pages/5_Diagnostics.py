@@ -0,0 +1,27 @@
+import pandas as pd
+import streamlit as st
+from metrics import METRICS
+from utils import check_password, page_config
+
+
+page_config()
+
+if not check_password():
+    st.stop()  # Do not continue if check_password is not True.
+
+
+st.title("Diagnostics")
+
+st.subheader("External calls")
+st.dataframe(pd.DataFrame(METRICS.percentiles('outbound_request_seconds')), hide_index=True, use_container_width=True)
+
+st.subheader("Page runs")
+st.dataframe(pd.DataFrame(METRICS.percentiles('page_run_seconds')), hide_index=True, use_container_width=True)
+
+st.subheader("Caches")
+caches = pd.DataFrame(METRICS.counters('cache_requests_total'))
+if not caches.empty:
+    caches = caches.pivot_table(index='cache', columns='result', values='value', fill_value=0, aggfunc='sum')
+st.dataframe(caches, use_container_width=True)
+
+st.download_button("Prometheus metrics", METRICS.prometheus(), file_name='metrics.prom', mime='text/plain')
@@ -0,0 +1,97 @@
+"""Computes the expensive data of the pages headlessly and publishes it as artifacts.
+
+    python src/precompute.py                   # once, e.g. from cron
+    python src/precompute.py --interval 900    # every 15 minutes
+
+The pages use artifacts that are recent enough (`ARTIFACTS_MAXAGE`) and fall
+back to computing the data themselves otherwise. With
+`ARTIFACTS_PRECOMPUTED=true` the app leaves ingesting the race results and
+prewarming the forecasts to this job. With `SUPABASE_SERVICEKEY` set it also
+looks up the weather of kick wax entries that were missed when they were added.
+"""
+import argparse
+import time
+from functools import partial
+from typing import Callable
+from streamlit.logger import get_logger
+from supabase import create_client
+
+from member_data import refresh_year_stats
+from race_data import load_race_matrix, publish_seeded_race, result_store
+from weather_data import load_weather_day, load_weather_races, publish_race_forecasts
+from kick_wax_repository import KickWaxAnalytics
+from login import supabase_cfg
+from races import load_races
+
+
+LOGGER = get_logger(__name__)
+
+
+def precompute_members():
+    refresh_year_stats()
+
+
+def precompute_races():
+    races = load_races()
+    store = result_store()
+    store.ingest({race.name: partial(load_race_matrix, race) for race in races})
+    for race in races:
+        if race.name in store.races():
+            publish_seeded_race(store, race)
+
+
+def precompute_forecasts():
+    for race in load_weather_races():
+        publish_race_forecasts(race)
+
+
+def precompute_kick_wax():
+    if not supabase_cfg.url or not supabase_cfg.serviceKey:
+        LOGGER.info('SUPABASE_URL or SUPABASE_SERVICEKEY not set, not looking up kick wax conditions')
+        return
+    analytics = KickWaxAnalytics(create_client(supabase_cfg.url, supabase_cfg.serviceKey), load_weather_day)
+    LOGGER.info('Stored the conditions of %d kick wax entries', analytics.backfill())
+
+
+TASKS: dict[str, Callable[[], None]] = {
+    'members': precompute_members,
+    'races': precompute_races,
+    'forecasts': precompute_forecasts,
+    'kickwax': precompute_kick_wax,
+}
+
+
+def run(tasks: list[str]) -> bool:
+    """Runs `tasks`, returns `False` if any of them failed."""
+    ok = True
+    for name in tasks:
+        start = time.perf_counter()
+        try:
+            TASKS[name]()
+            LOGGER.info('Precomputed %s in %.1f s', name, time.perf_counter() - start)
+        except Exception as e:
+            # the pages keep using the previous artifacts or compute the data themselves
+            LOGGER.exception('Could not precompute %s: %s', name, e)
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', default=list(TASKS), metavar='TASK',
+                        help=f'tasks to run, any of {", ".join(TASKS)}')
+    parser.add_argument('--interval', type=float, help='seconds between runs, runs once if not set')
+    args = parser.parse_args()
+    unknown = set(args.only) - set(TASKS)
+    if unknown:
+        parser.error(f'unknown tasks {", ".join(sorted(unknown))}')
+
+    while True:
+        ok = run(args.only)
+        if args.interval is None:
+            raise SystemExit(0 if ok else 1)
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import datetime as dt
+import hashlib
+import json
+import pathlib
+import pandas as pd
+import streamlit as st
+
+from functools import cache, partial
+from pydantic_settings import BaseSettings
+from data import artifacts, artifacts_cfg
+from live_race import LiveRace
+from race_matrix import RaceMatrix
+from races import Race, load_races
+from result_sheet import read_result_sheet
+from result_store import ResultStore
+from seedings import seed_matrix
+from sheet_cache import SheetCache
+from utils import CACHE_PATH
+
+
+class GoogleSheetsConfig(BaseSettings):
+    baseUrl: str = 'https://docs.google.com/spreadsheets/d'
+    cacheDir: str = str(CACHE_PATH / 'sheets')
+    resultsDir: str = str(CACHE_PATH / 'results')
+    ttl: int = 300
+    timeout: float = 10.0
+    liveInterval: int = 30
+
+    class Config:
+        env_file = '.env'
+        env_prefix = 'SHEETS_'
+
+
+sheets_cfg = GoogleSheetsConfig()
+
+
+@cache
+def get_sheet_cache() -> SheetCache:
+    return SheetCache(sheets_cfg.cacheDir, ttl=sheets_cfg.ttl, timeout=sheets_cfg.timeout)
+
+@cache
+def get_live_sheet_cache() -> SheetCache:
+    # revalidated on every poll of a live race, `LiveRace` limits how often that happens
+    return SheetCache(pathlib.Path(sheets_cfg.cacheDir) / 'live', ttl=0, timeout=sheets_cfg.timeout)
+
+def sheet_url(spreadsheet_id: str, sheet_id: str, format: str = 'csv') -> str:
+    return f'{sheets_cfg.baseUrl}/{spreadsheet_id}/export?format={format}&gid={sheet_id}'
+
+def load_race_sheet(race: Race, cache: SheetCache | None = None) -> pd.DataFrame:
+    """Typed result sheet of `race`, see `read_result_sheet`."""
+    # the key names the columns read, the cached frame holds only those
+    key = f'{race.doc_id}_{race.sheet_id}_results' + ''.join(f'_{c}' for c in [*(race.checkpoints or []), *race.search_columns])
+    checkpoints = [str(km) for km in race.checkpoints] if race.checkpoints else None
+    read = partial(read_result_sheet, checkpoints=checkpoints, labels=race.search_columns)
+    return (cache or get_sheet_cache()).get(key, sheet_url(race.doc_id, race.sheet_id), read=read)
+
+def load_race_matrix(race: Race, cache: SheetCache | None = None) -> RaceMatrix:
+    df = load_race_sheet(race, cache)
+    return RaceMatrix.from_seconds(df.set_index('skier').drop(columns=race.search_columns))
+
+def load_skier_labels(race: Race) -> pd.DataFrame | None:
+    """The `search_columns` of `race` by skier, `None` if it has none."""
+    if not race.search_columns:
+        return None
+    return load_race_sheet(race).set_index('skier')[race.search_columns]
+
+@cache
+def result_store() -> ResultStore:
+    """The result store of this process, created on first use."""
+    return ResultStore(sheets_cfg.resultsDir)
+
+@st.cache_resource(ttl=sheets_cfg.ttl, show_spinner='Loading race results...')
+def get_result_store() -> ResultStore:
+    """Result store with all configured races, re-ingested concurrently every `ttl` seconds."""
+    store = result_store()
+    if not artifacts_cfg.precomputed:
+        store.ingest({race.name: partial(load_race_matrix, race) for race in load_races()})
+    return store
+
+@st.cache_resource
+def get_live_race(name: str) -> LiveRace:
+    """Live results of race `name`, polled once for all sessions following it."""
+    race = next(race for race in load_races() if race.name == name)
+    return LiveRace(partial(load_race_matrix, race, cache=get_live_sheet_cache()), interval=sheets_cfg.liveInterval)
+
+def seedings_hash(seedings: dict[str, dict[str, dt.timedelta]]) -> str:
+    data = {name: {level: limit.total_seconds() for level, limit in seeding.items()} for name, seeding in seedings.items()}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+
+def load_seeded_race(store: ResultStore, name: str, seedings: dict[str, dict[str, dt.timedelta]]) -> RaceMatrix:
+    """Results of race `name` with the average skier of each seeding time, precomputed if up to date."""
+    meta = {'version': store.version(name), 'seedings': seedings_hash(seedings)}
+    artifact = artifacts.latest(f'races/{name}')
+    if artifact is not None and artifact.meta == meta:
+        return RaceMatrix.from_ns_frame(artifact.frame())
+    return seed_matrix(store.race_matrix(name), seedings)
+
+def publish_seeded_race(store: ResultStore, race: Race):
+    seeded = seed_matrix(store.race_matrix(race.name), race.seedings)
+    artifacts.publish_frame(f'races/{race.name}', seeded.to_frame(seeded.times),
+                            meta={'version': store.version(race.name), 'seedings': seedings_hash(race.seedings)})
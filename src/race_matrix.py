@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from functools import cached_property
+import numpy as np
+import pandas as pd
+
+
+NAT = np.iinfo(np.int64).min
+NS_PER_SECOND = 10**9
+NS_PER_MINUTE = 60 * NS_PER_SECOND
+NS_PER_HOUR = 60 * NS_PER_MINUTE
+
+
+def _to_ns(column: pd.Series) -> np.ndarray:
+    if pd.api.types.is_timedelta64_dtype(column):
+        return column.to_numpy(dtype='timedelta64[ns]').view(np.int64)
+    return pd.to_datetime(column).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def _valid(times: np.ndarray) -> np.ndarray:
+    return times != NAT
+
+
+def _elapsed(times: np.ndarray) -> np.ndarray:
+    elapsed = (times - times[:, :1]).astype(np.float64)
+    valid = _valid(times)
+    elapsed[~(valid & valid[:, :1])] = np.nan
+    return elapsed
+
+
+# derived matrices computed row by row, carried over by `select`, `append` and `merge`
+_ROW_DERIVED = {'valid': _valid, 'elapsed': _elapsed}
+
+
+@dataclass(frozen=True)
+class RaceMatrix:
+    """Split times of a race as a dense matrix, built once per race.
+
+    `times` holds the checkpoint times in int64 nanoseconds (`NAT` where a
+    checkpoint is missing) with one row per skier and one column per
+    checkpoint, ordered by `km`.
+    """
+
+    times: np.ndarray
+    km: np.ndarray
+    skiers: pd.Index
+    columns: pd.Index
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> 'RaceMatrix':
+        km = np.array([int(c) for c in data.columns], dtype=np.int64)
+        order = np.argsort(km, kind='stable')
+        columns = data.columns[order]
+        times = np.empty((len(data), len(columns)), dtype=np.int64)
+        for j, column in enumerate(columns):
+            times[:, j] = _to_ns(data[column])
+        times.flags.writeable = False
+        return cls(times=times, km=km[order], skiers=data.index, columns=columns)
+
+    @classmethod
+    def from_seconds(cls, data: pd.DataFrame) -> 'RaceMatrix':
+        """Checkpoint times in int64 seconds, `NAT` where missing, as read by `result_sheet`."""
+        km = np.array([int(c) for c in data.columns], dtype=np.int64)
+        order = np.argsort(km, kind='stable')
+        seconds = data.to_numpy(dtype=np.int64)[:, order]
+        times = np.where(seconds == NAT, NAT, seconds * NS_PER_SECOND)
+        times.flags.writeable = False
+        return cls(times=times, km=km[order], skiers=data.index, columns=data.columns[order])
+
+    @classmethod
+    def from_ns_frame(cls, data: pd.DataFrame) -> 'RaceMatrix':
+        """Inverse of `to_frame(times)`, the checkpoint times are int64 nanoseconds already."""
+        times = data.to_numpy(dtype=np.int64, copy=True)
+        times.flags.writeable = False
+        return cls(times=times, km=np.array([int(c) for c in data.columns], dtype=np.int64),
+                   skiers=data.index, columns=data.columns)
+
+    @classmethod
+    def of(cls, data: 'pd.DataFrame | RaceMatrix') -> 'RaceMatrix':
+        return data if isinstance(data, RaceMatrix) else cls.from_frame(data)
+
+    def select(self, skiers: list[str]) -> 'RaceMatrix':
+        """Rows of `skiers` in the given order, repeated skiers are selected once."""
+        skiers = list(dict.fromkeys(skiers))
+        rows = self.skiers.get_indexer(skiers)
+        if (rows < 0).any():
+            raise KeyError([s for s, r in zip(skiers, rows) if r < 0])
+        times = self.times[rows]
+        times.flags.writeable = False
+        selected = RaceMatrix(times=times, km=self.km, skiers=self.skiers[rows], columns=self.columns)
+        return self._carry_derived(selected, rows)
+
+    def append(self, skiers: list[str], times: np.ndarray) -> 'RaceMatrix':
+        times = np.vstack([self.times, times])
+        times.flags.writeable = False
+        skiers = self.skiers.append(pd.Index(skiers, name=self.skiers.name))
+        appended = RaceMatrix(times=times, km=self.km, skiers=skiers, columns=self.columns)
+        return self._carry_derived(appended, np.r_[np.arange(len(self.skiers)), np.full(len(times) - len(self.skiers), -1)])
+
+    def merge(self, data: 'RaceMatrix') -> tuple['RaceMatrix', np.ndarray]:
+        """`data`, a newer version of this race, in the row order of this matrix.
+
+        Skiers keep their rows and new skiers are appended, derived matrices
+        computed so far are only recomputed for new and changed rows. Returns
+        the merged matrix and the indices of these rows. If skiers or
+        checkpoints were removed, `data` is returned as it is.
+        """
+        n = len(self.skiers)
+        rows = self.skiers.get_indexer(data.skiers) if self.skiers.is_unique and data.skiers.is_unique else None
+        if rows is None or not self.columns.equals(data.columns) or (rows >= 0).sum() != n:
+            return data, np.arange(len(data.skiers))
+        if np.array_equal(rows[:n], np.arange(n)):
+            # skiers kept their rows, new ones were added at the end of the sheet
+            merged = data
+        else:
+            known = rows >= 0
+            times = np.empty((len(data.skiers), len(self.km)), dtype=np.int64)
+            times[:n] = self.times
+            times[rows[known]] = data.times[known]
+            times[n:] = data.times[~known]
+            times.flags.writeable = False
+            merged = RaceMatrix(times=times, km=self.km, skiers=self.skiers.append(data.skiers[~known]), columns=self.columns)
+        changed = np.r_[np.flatnonzero((merged.times[:n] != self.times).any(axis=1)), np.arange(n, len(merged.times))]
+        source = np.r_[np.arange(n), np.full(len(merged.times) - n, -1)]
+        source[changed] = -1
+        return self._carry_derived(RaceMatrix(merged.times, self.km, merged.skiers, self.columns), source), changed
+
+    def _carry_derived(self, result: 'RaceMatrix', source: np.ndarray) -> 'RaceMatrix':
+        """Takes the derived rows computed so far over into `result`.
+
+        `source` is the row of `self` of every row of `result`, -1 for rows
+        that must be computed.
+        """
+        fresh = source < 0
+        n = len(self.skiers)
+        # rows that stay in place are copied in one block, if all further rows are new
+        in_place = len(source) >= n and bool(((source[:n] == np.arange(n)) | fresh[:n]).all() and fresh[n:].all())
+        for name, derive in _ROW_DERIVED.items():
+            if name in self.__dict__:
+                computed = self.__dict__[name]
+                values = np.empty(result.times.shape, dtype=computed.dtype)
+                if in_place:
+                    values[:n] = computed
+                else:
+                    values[~fresh] = computed[source[~fresh]]
+                values[fresh] = derive(result.times[fresh])
+                # cached_property stores its value in the instance dict, which is writable for frozen dataclasses too
+                result.__dict__[name] = values
+        return result
+
+    def to_frame(self, values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=self.skiers, columns=self.columns)
+
+    @cached_property
+    def valid(self) -> np.ndarray:
+        return _valid(self.times)
+
+    @cached_property
+    def elapsed(self) -> np.ndarray:
+        """Time since each skier's own start in ns as float64, NaN where missing."""
+        return _elapsed(self.times)
+
+    def end_time(self) -> np.ndarray:
+        return self.elapsed[:, -1]
+
+    def race_hours(self) -> np.ndarray:
+        return self.elapsed / NS_PER_HOUR
+
+    def diff_to_winner(self) -> np.ndarray:
+        end = self.end_time()
+        if np.isnan(end).all():
+            return np.full(self.times.shape, np.nan)
+        winner = self.elapsed[np.nanargmin(end)]
+        return (winner - self.elapsed) / NS_PER_MINUTE
+
+    def diff_to_winner_section(self) -> np.ndarray:
+        gain = np.diff(self.diff_to_winner(), axis=1) * 60 / np.diff(self.km)
+        section = np.zeros(self.times.shape)
+        section[:, 1:] = np.nan_to_num(gain, nan=0.0)
+        return section
+
+    def diff_to_leader(self) -> np.ndarray:
+        # fastest time per checkpoint, assuming all skiers started at the same time
+        present = self.valid.any(axis=0)
+        if not present.any() or not present[0]:
+            return np.full(self.times.shape, np.nan)
+        leader = np.where(self.valid, self.times, np.iinfo(np.int64).max).min(axis=0)
+        leader = np.where(present, leader, leader[0])
+        lead = np.where(present, (leader - leader[0]).astype(np.float64), np.nan)
+        return (lead - self.elapsed) / NS_PER_MINUTE
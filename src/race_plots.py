@@ -1,9 +1,14 @@
-from typing import Callable
+from typing import Any, Callable
 import pandas as pd
 import plotly.express as px
+import plotly.io as pio
 from plotly.graph_objs import Figure
 from pydantic_settings import BaseSettings
-import datetime as dt
+from race_matrix import RaceMatrix
+
+
+# above this many skiers the lines are drawn with WebGL instead of SVG
+WEBGL_THRESHOLD = 100
 
 
 class RacePlot(BaseSettings):
@@ -11,79 +16,90 @@ class RacePlot(BaseSettings):
     name: str
     explanation: str
     y_label: str
-    pre_process: Callable[[pd.DataFrame], pd.DataFrame] = lambda df: df
+    pre_process: Callable[[pd.DataFrame | RaceMatrix], pd.DataFrame] = lambda df: df
 
     def __str__(self) -> str:
         return self.name
     
-    def make_figure(self, data: pd.DataFrame) -> Figure:
-        df = self.pre_process(data)
-        # Convert the dataframe to long format
-        df_long = df.reset_index().melt(id_vars='skier', var_name='km', value_name='time')
-        # Convert the km column to numeric
-        df_long['km'] = pd.to_numeric(df_long['km'])
-        fig = px.line(
-            df_long, x='km', y='time', color='skier',
-            title=self.name,
-            labels={
-                'km': 'Race Distance [km]',
-                'time': self.y_label
-            })
-        return fig
-
-
-def end_time(data: pd.DataFrame) -> pd.Series:
-    km = [int(i) for i in data.columns]
-    return data[str(max(km))] - data[str(min(km))]
-
-
-def race_hours(data: pd.DataFrame) -> pd.DataFrame:
-    km = [int(i) for i in data.columns]
-    df = data.sub(data[str(min(km))], axis=0)
-    return df.apply(pd.to_numeric)/(60*60*1e9)
-
-
-def make_diff_to_winner(data: pd.DataFrame) -> pd.DataFrame:
-    # find fastest skier
-    fastest_skier = end_time(data).idxmin()
-    # calculate difference to fastest skier
-    df = data.sub(data.loc[fastest_skier])*(-1)
-    df = df.apply(pd.to_numeric)/(60*1e9)
-    km = [int(i) for i in data.columns]
-    df = df.sub(df.loc[:,str(min(km))], axis=0)
-    return df
-
-
-def make_diff_to_winner_section(data: pd.DataFrame) -> pd.DataFrame:
-    df = make_diff_to_winner(data)
-    df = df.diff(axis=1)
-    km = [int(i) for i in data.columns]
-    df = df * 60 / km
-    df.fillna(0, inplace=True)
-    return df
+    def make_figure(self, data: pd.DataFrame | RaceMatrix) -> Figure:
+        return Figure(self.figure_dict(data))
 
-    
-def make_diff_to_leader(data: pd.DataFrame) -> pd.DataFrame:
-    km = [int(i) for i in data.columns]
-    # find fastest time per section
-    min_times = data.min()
-    # calculate difference to fastest skier, assuming to have started at the same time
-    df = data.sub(min_times)
-    df = df.apply(pd.to_numeric)/(60*1e9)
-    df = df.sub(df.loc[:,str(min(km))], axis=0)*(-1)
-    return df
-
-
-def add_seedings(data: pd.DataFrame, seedings: dict[str, dict[str, dt.timedelta]]) -> pd.DataFrame:
-    t = end_time(data)
-    r = race_hours(data)
-    for race, seeding in seedings.items():
-        for k, v in seeding.items():
-            i = t[t < v].index
-            t = t.drop(i)
-            m = r.loc[i].mean().apply(pd.to_timedelta, unit='h')
-            data.loc[f'{race}, {k}'] = data.min().min() + m
-    return data
+    def figure_dict(self, data: pd.DataFrame | RaceMatrix, webgl_threshold: int = WEBGL_THRESHOLD) -> dict[str, Any]:
+        """Figure with one line per skier, built straight from the wide frame.
+
+        Plain trace dicts skip the long format melt and the per-trace
+        validation of `px.line`, which dominate for large selections.
+        """
+        df = self.pre_process(data)
+        km = pd.to_numeric(df.columns).to_numpy()
+        trace_type = 'scattergl' if len(df) > webgl_threshold else 'scatter'
+        traces = [{
+            'type': trace_type,
+            'mode': 'lines',
+            'name': skier,
+            'legendgroup': skier,
+            'x': km,
+            'y': values,
+            'hovertemplate': f'skier={skier}<br>Race Distance [km]=%{{x}}<br>{self.y_label}=%{{y}}<extra></extra>',
+        } for skier, values in zip(df.index, df.to_numpy(dtype=float))]
+        return {
+            'data': traces,
+            'layout': {
+                'title': {'text': self.name},
+                'xaxis': {'title': {'text': 'Race Distance [km]'}},
+                'yaxis': {'title': {'text': self.y_label}},
+                'legend': {'title': {'text': 'skier'}, 'tracegroupgap': 0},
+            },
+        }
+
+    def figure_json(self, data: pd.DataFrame | RaceMatrix, webgl_threshold: int = WEBGL_THRESHOLD) -> str:
+        return pio.to_json(self.figure_dict(data, webgl_threshold), validate=False)
+
+
+def make_skier_pacing(results: pd.DataFrame) -> Figure:
+    """Pace per section of one skier in every race, as returned by `ResultStore.skier_results`."""
+    results = results.dropna(subset=['elapsed']).sort_values(['race', 'km'])
+    minutes = results['elapsed'].dt.total_seconds() / 60
+    section = results.groupby('race', sort=False)
+    pace = minutes.groupby(results['race']).diff() / section['km'].diff()
+    df = pd.DataFrame({
+        'race': results['race'],
+        'share': 100 * results['km'] / section['km'].transform('max'),
+        'km': results['km'],
+        'pace': pace,
+    }).dropna()
+    return px.line(
+        df, x='share', y='pace', color='race', hover_data=['km'], markers=True,
+        title='Pacing across races',
+        labels={
+            'share': 'Race Distance [%]',
+            'pace': 'Pace of the section [min/km]'
+        })
+
+
+def end_time(data: pd.DataFrame | RaceMatrix) -> pd.Series:
+    m = RaceMatrix.of(data)
+    return pd.Series(pd.to_timedelta(m.end_time()), index=m.skiers)
+
+
+def race_hours(data: pd.DataFrame | RaceMatrix) -> pd.DataFrame:
+    m = RaceMatrix.of(data)
+    return m.to_frame(m.race_hours())
+
+
+def make_diff_to_winner(data: pd.DataFrame | RaceMatrix) -> pd.DataFrame:
+    m = RaceMatrix.of(data)
+    return m.to_frame(m.diff_to_winner())
+
+
+def make_diff_to_winner_section(data: pd.DataFrame | RaceMatrix) -> pd.DataFrame:
+    m = RaceMatrix.of(data)
+    return m.to_frame(m.diff_to_winner_section())
+
+
+def make_diff_to_leader(data: pd.DataFrame | RaceMatrix) -> pd.DataFrame:
+    m = RaceMatrix.of(data)
+    return m.to_frame(m.diff_to_leader())
 
 
 RACE_PLOTS = [
@@ -1,6 +1,6 @@
 import datetime as dt
 from pydantic import BaseModel
-import yaml
+from resource_registry import yaml_resource
 
 
 class Race(BaseModel):
@@ -13,14 +13,17 @@ class Race(BaseModel):
     doc_id: str
     sheet_id: str
     seedings: dict[str, dict[str, dt.timedelta]] = {}
+    # km marks to read from the sheet, all if not set
+    checkpoints: list[int] | None = None
+    # further sheet columns the skier search matches, e.g. club or category
+    search_columns: list[str] = []
 
     def __str__(self) -> str:
         return self.name
 
-RACES = []
-with open('src/resources/races.yml', 'r') as stream:
-    try:
-        races = yaml.safe_load(stream)
-        RACES = [Race(**race) for race in races]
-    except yaml.YAMLError as e:
-        print(e)
\ No newline at end of file
+
+_races = yaml_resource('races.yml', lambda races: [Race(**race) for race in races or []])
+
+
+def load_races() -> list[Race]:
+    return _races.get()
@@ -0,0 +1,62 @@
+import pathlib
+import threading
+from typing import Any, Callable, Generic, TypeVar
+import yaml
+from pydantic import ValidationError
+from streamlit.logger import get_logger
+
+
+LOGGER = get_logger(__name__)
+
+RESOURCES_PATH = pathlib.Path(__file__).resolve().parent / 'resources'
+
+T = TypeVar('T')
+
+
+class YamlResource(Generic[T]):
+    """YAML file below `resources/`, parsed and validated once per process.
+
+    `get` only stats the file and parses it again when its mtime changed, so
+    a rerun costs a single `stat` call. If a changed file cannot be parsed
+    the previous version is kept.
+    """
+
+    def __init__(self, name: str, parse: Callable[[Any], T]):
+        self.path = RESOURCES_PATH / name
+        self.parse = parse
+        self._lock = threading.Lock()
+        self._loaded: tuple[int, T] | None = None
+
+    def get(self) -> T:
+        mtime = self.path.stat().st_mtime_ns
+        loaded = self._loaded
+        if loaded is None or loaded[0] != mtime:
+            with self._lock:
+                loaded = self._loaded
+                if loaded is None or loaded[0] != mtime:
+                    loaded = self._loaded = (mtime, self._load(loaded))
+        return loaded[1]
+
+    def _load(self, previous: tuple[int, T] | None) -> T:
+        try:
+            with open(self.path, 'r') as stream:
+                value = self.parse(yaml.safe_load(stream))
+            LOGGER.info('Loaded %s', self.path.name)
+            return value
+        except (yaml.YAMLError, ValidationError) as e:
+            if previous is None:
+                raise
+            LOGGER.error('Could not reload %s, keeping the previous version: %s', self.path, e)
+            return previous[1]
+
+
+_registry: dict[str, YamlResource] = {}
+_registry_lock = threading.Lock()
+
+
+def yaml_resource(name: str, parse: Callable[[Any], T]) -> YamlResource[T]:
+    """The process-wide resource of `name` (relative to `resources/`)."""
+    with _registry_lock:
+        if name not in _registry:
+            _registry[name] = YamlResource(name, parse)
+        return _registry[name]
@@ -0,0 +1,73 @@
+import csv
+import io
+from typing import Sequence
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from race_matrix import NAT
+
+
+SKIER = 'skier'
+
+
+def parse_durations(values: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    """`H:MM:SS` strings as int64 seconds, `NAT` where empty.
+
+    Hours may exceed 24. The strings are split and converted by Arrow in one
+    pass over the column, raises `ValueError` for anything else.
+    """
+    values = pc.utf8_trim_whitespace(values)
+    parts = pc.split_pattern(values, ':')
+    invalid = pc.not_equal(pc.list_value_length(parts), 3)
+    if pc.any(invalid).as_py():
+        bad = pc.filter(values, invalid)
+        raise ValueError(f'Invalid durations, expected H:MM:SS: {bad[:5].to_pylist()}')
+    hms = pc.cast(pc.list_flatten(parts), pa.int64()).to_numpy().reshape(-1, 3)
+    seconds = np.full(len(values), NAT, dtype=np.int64)
+    seconds[np.asarray(values.is_valid())] = hms @ np.array([3600, 60, 1])
+    return seconds
+
+
+def read_result_sheet(source: bytes, checkpoints: Sequence[str] | None = None, labels: Sequence[str] = (),
+                      block_size: int = 1 << 20) -> pd.DataFrame:
+    """Result sheet export as a `skier` column, the `labels` columns and the checkpoint times in int64 seconds.
+
+    `labels` are further text columns such as club or category. Only these
+    and the `checkpoints` columns (all other columns if `None`) are read.
+    The CSV is parsed with this schema in blocks of `block_size` bytes and
+    the times of every block are converted before the next one is read, so
+    no column of Python strings is built for the times. Rows without a
+    skier, e.g. the empty rows at the end of a sheet, are dropped.
+    """
+    header = next(csv.reader(io.StringIO(source.split(b'\n', 1)[0].decode('utf-8-sig'))), [])
+    if SKIER not in header:
+        raise ValueError(f'Result sheet has no {SKIER} column: {header}')
+    labels = list(labels)
+    columns = [c for c in header if c not in (SKIER, *labels)] if checkpoints is None else [str(c) for c in checkpoints]
+    missing = set(columns + labels) - set(header)
+    if missing:
+        raise ValueError(f'Result sheet has no columns {sorted(missing)}')
+    reader = pacsv.open_csv(
+        io.BytesIO(source),
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in [SKIER, *labels, *columns]},
+            include_columns=[SKIER, *labels, *columns],
+            strings_can_be_null=True))
+    texts: dict[str, list[pa.Array]] = {name: [] for name in [SKIER, *labels]}
+    blocks = []
+    for batch in reader:
+        batch = batch.filter(batch.column(SKIER).is_valid())
+        block = np.empty((batch.num_rows, len(columns)), dtype=np.int64)
+        for j, column in enumerate(columns):
+            block[:, j] = parse_durations(batch.column(column))
+        for name, chunks in texts.items():
+            chunks.append(batch.column(name))
+        blocks.append(block)
+    times = np.concatenate(blocks) if blocks else np.empty((0, len(columns)), dtype=np.int64)
+    df = pd.DataFrame(times, columns=columns)
+    for i, (name, chunks) in enumerate(texts.items()):
+        df.insert(i, name, pa.chunked_array(chunks, pa.string()).to_numpy(zero_copy_only=False))
+    return df
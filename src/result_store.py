@@ -0,0 +1,193 @@
+import hashlib
+import json
+import pathlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Mapping
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from streamlit.logger import get_logger
+from atomic_file import atomic_path
+from race_matrix import NAT, RaceMatrix
+
+
+LOGGER = get_logger(__name__)
+
+SCHEMA = pa.schema([
+    ('skier', pa.string()),
+    ('row', pa.int32()),
+    ('km', pa.int32()),
+    ('time', pa.timestamp('ns')),
+    ('elapsed', pa.duration('ns')),
+])
+
+
+class ResultStore:
+    """Split times of all races as Parquet files, one per race.
+
+    Races are stored in long format (skier, row, km, time, elapsed) sorted by
+    skier, where `elapsed` is the duration since the skier's own start and
+    `row` keeps the order of the results sheet. `skiers.parquet` indexes the
+    races of every skier, so the results of one skier across all races are
+    read from those files only, filtered on the sorted skier column.
+    """
+
+    def __init__(self, directory: str | pathlib.Path, max_workers: int = 4, row_group_size: int = 8192):
+        self.directory = pathlib.Path(directory)
+        self.max_workers = max_workers
+        self.row_group_size = row_group_size
+        self._lock = threading.Lock()
+        self._manifest: dict[str, dict] = self._read_json('manifest.json')
+        self._manifest_mtime = self._mtime('manifest.json')
+        self._index: tuple[float, dict[str, list[str]]] | None = None
+
+    def ingest(self, races: Mapping[str, Callable[[], RaceMatrix]]) -> dict[str, bool]:
+        """Loads and stores all `races` concurrently.
+
+        Returns whether each race changed, a race that cannot be loaded keeps
+        its stored copy and maps to `False`.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='result-store') as executor:
+            futures = {name: executor.submit(self._ingest, name, loader) for name, loader in races.items()}
+        changed = {}
+        for name, future in futures.items():
+            try:
+                changed[name] = future.result()
+            except Exception as e:
+                LOGGER.warning('Could not ingest results of %s: %s', name, e)
+                changed[name] = False
+        if any(changed.values()) or not (self.directory / 'skiers.parquet').exists():
+            self._write_index()
+        return changed
+
+    def races(self) -> list[str]:
+        with self._lock:
+            return list(self._current_manifest())
+
+    def version(self, race: str) -> str | None:
+        """Content hash of the stored results of `race`."""
+        with self._lock:
+            return self._current_manifest().get(race, {}).get('hash')
+
+    def race_matrix(self, race: str) -> RaceMatrix:
+        table = pq.read_table(self._path(race), columns=['skier', 'row', 'km', 'time'])
+        df = table.to_pandas()
+        rows = df['row'].to_numpy()
+        km, columns = np.unique(df['km'].to_numpy(), return_inverse=True)
+        n = rows.max() + 1 if len(rows) else 0
+        times = np.full((n, len(km)), NAT, dtype=np.int64)
+        times[rows, columns] = df['time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        skiers = np.empty(n, dtype=object)
+        skiers[rows] = df['skier'].to_numpy()
+        times.flags.writeable = False
+        return RaceMatrix(times=times, km=km.astype(np.int64), skiers=pd.Index(skiers, name='skier'),
+                          columns=pd.Index([str(k) for k in km]))
+
+    def skiers(self) -> list[str]:
+        return sorted(self._skier_index())
+
+    def races_of(self, skier: str) -> list[str]:
+        return self._skier_index().get(skier, [])
+
+    def skier_results(self, skier: str) -> pd.DataFrame:
+        """Elapsed time of `skier` at every checkpoint of every race (long format: race, km, elapsed)."""
+        frames = []
+        for race in self.races_of(skier):
+            table = pq.read_table(self._path(race), columns=['km', 'elapsed'], filters=[('skier', '==', skier)])
+            frame = table.to_pandas()
+            frame.insert(0, 'race', race)
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame({'race': pd.Series(dtype=object), 'km': pd.Series(dtype=np.int32),
+                                 'elapsed': pd.Series(dtype='timedelta64[ns]')})
+        return pd.concat(frames, ignore_index=True)
+
+    def _ingest(self, name: str, loader: Callable[[], RaceMatrix]) -> bool:
+        race = loader()
+        table = _to_table(race)
+        digest = hashlib.sha256(race.times.tobytes() + race.km.tobytes() + '\n'.join(race.skiers).encode()).hexdigest()
+        with self._lock:
+            if self._current_manifest().get(name, {}).get('hash') == digest and self._path(name).exists():
+                return False
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(name)
+        with atomic_path(path) as tmp:
+            pq.write_table(table, tmp, row_group_size=self.row_group_size)
+        with self._lock:
+            # races ingested meanwhile by other processes are kept
+            manifest = self._current_manifest()
+            manifest[name] = {'file': path.name, 'hash': digest, 'ingested': time.time(), 'skiers': len(race.skiers)}
+            self._write_json('manifest.json', manifest)
+            self._manifest_mtime = self._mtime('manifest.json')
+        return True
+
+    def _write_index(self):
+        frames = []
+        for race in self.races():
+            skiers = pq.read_table(self._path(race), columns=['skier']).column('skier').unique()
+            frames.append(pa.table({'skier': skiers, 'race': pa.array([race] * len(skiers), pa.string())}))
+        index = pa.concat_tables(frames) if frames else pa.table({'skier': pa.array([], pa.string()), 'race': pa.array([], pa.string())})
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with atomic_path(self.directory / 'skiers.parquet') as tmp:
+            pq.write_table(index.sort_by('skier'), tmp)
+
+    def _skier_index(self) -> dict[str, list[str]]:
+        """Races per skier, reloaded whenever `skiers.parquet` changes."""
+        path = self.directory / 'skiers.parquet'
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return {}
+        index = self._index
+        if index is None or index[0] != mtime:
+            df = pq.read_table(path).to_pandas()
+            index = (mtime, df.groupby('skier', sort=False)['race'].agg(list).to_dict())
+            self._index = index
+        return index[1]
+
+    def _current_manifest(self) -> dict[str, dict]:
+        # picks up races ingested by other processes, e.g. the precompute job
+        mtime = self._mtime('manifest.json')
+        if mtime is not None and mtime != self._manifest_mtime:
+            self._manifest, self._manifest_mtime = self._read_json('manifest.json'), mtime
+        return self._manifest
+
+    def _mtime(self, name: str) -> int | None:
+        try:
+            return (self.directory / name).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _path(self, race: str) -> pathlib.Path:
+        return self.directory / (re.sub(r'[^\w-]+', '_', race) + '.parquet')
+
+    def _read_json(self, name: str) -> dict:
+        try:
+            with open(self.directory / name, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json(self, name: str, data: dict):
+        with atomic_path(self.directory / name) as tmp, open(tmp, 'w') as f:
+            json.dump(data, f)
+
+
+def _to_table(race: RaceMatrix) -> pa.Table:
+    n, k = race.times.shape
+    times = race.times.ravel()
+    elapsed = race.elapsed.ravel()
+    missing = np.isnan(elapsed)
+    table = pa.table({
+        'skier': pa.array(np.repeat(race.skiers.to_numpy(dtype=object), k), pa.string()),
+        'row': np.repeat(np.arange(n, dtype=np.int32), k),
+        'km': np.tile(race.km.astype(np.int32), n),
+        'time': pa.array(times.view('datetime64[ns]'), pa.timestamp('ns'), mask=times == NAT),
+        'elapsed': pa.array(np.where(missing, 0, elapsed).astype(np.int64).view('timedelta64[ns]'),
+                            pa.duration('ns'), mask=missing),
+    }, schema=SCHEMA)
+    return table.sort_by([('skier', 'ascending'), ('row', 'ascending'), ('km', 'ascending')])
@@ -0,0 +1,65 @@
+import datetime as dt
+import numpy as np
+import pandas as pd
+from race_matrix import NAT, RaceMatrix
+
+
+def seed_times(race: RaceMatrix, seedings: dict[str, dict[str, dt.timedelta]]) -> tuple[list[str], np.ndarray]:
+    """Average split profile of the skiers of every seeding level.
+
+    A level contains the skiers finishing below its limit that are not already
+    part of a previous level of the same race. End times are sorted once, level
+    boundaries are found with `searchsorted` and the mean profiles are read from
+    cumulative sums, so all levels of all races are computed in one pass.
+
+    Returns the row labels (`'<race>, <level>'`) and the checkpoint times of the
+    seed rows in int64 nanoseconds, starting at the earliest time of the race.
+    """
+    labels, lower, upper = [], [], []
+    for name, seeding in seedings.items():
+        bound = -np.inf
+        for level, limit in seeding.items():
+            labels.append(f'{name}, {level}')
+            lower.append(bound)
+            upper.append(float(pd.Timedelta(limit).value))
+            bound = max(bound, upper[-1])
+    if not labels:
+        return labels, np.empty((0, len(race.km)), dtype=np.int64)
+
+    end = race.end_time()
+    finished = np.flatnonzero(~np.isnan(end))
+    order = finished[np.argsort(end[finished], kind='stable')]
+    start = race.times[order, :1]
+    valid = race.valid[order] & race.valid[order, :1]
+    elapsed = np.where(valid, race.times[order] - start, 0)
+    sums = np.zeros((len(order) + 1, len(race.km)), dtype=np.int64)
+    counts = np.zeros(sums.shape, dtype=np.int64)
+    np.cumsum(elapsed, axis=0, out=sums[1:])
+    np.cumsum(valid, axis=0, out=counts[1:])
+
+    end_sorted = end[order]
+    a = np.searchsorted(end_sorted, lower, side='left')
+    b = np.maximum(np.searchsorted(end_sorted, upper, side='left'), a)
+    n = counts[b] - counts[a]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (sums[b] - sums[a]) / n
+
+    base = race.times[race.valid].min() if race.valid.any() else 0
+    times = np.full(mean.shape, NAT, dtype=np.int64)
+    present = n > 0
+    times[present] = base + np.rint(mean[present]).astype(np.int64)
+    return labels, times
+
+
+def seed_matrix(race: RaceMatrix, seedings: dict[str, dict[str, dt.timedelta]]) -> RaceMatrix:
+    labels, times = seed_times(race, seedings)
+    return race.append(labels, times)
+
+
+def add_seedings(data: pd.DataFrame, seedings: dict[str, dict[str, dt.timedelta]]) -> pd.DataFrame:
+    """Returns a copy of `data` with an average skier row for each seeding level."""
+    race = RaceMatrix.from_frame(data)
+    labels, times = seed_times(race, seedings)
+    unit = 'timedelta64[ns]' if all(pd.api.types.is_timedelta64_dtype(t) for t in data.dtypes) else 'datetime64[ns]'
+    seeds = pd.DataFrame(times.view(unit), index=pd.Index(labels, name=data.index.name), columns=race.columns)
+    return pd.concat([data, seeds[data.columns]])
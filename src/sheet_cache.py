@@ -0,0 +1,129 @@
+import hashlib
+import io
+import json
+import pathlib
+import threading
+import time
+from collections import defaultdict
+from typing import Callable
+
+import pandas as pd
+import requests
+from streamlit.logger import get_logger
+from atomic_file import atomic_path
+from metrics import METRICS
+
+
+LOGGER = get_logger(__name__)
+
+
+def read_csv(content: bytes) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(content))
+
+
+class SheetCache:
+    """On-disk Parquet cache for Google Sheets exports.
+
+    Every sheet is stored as `<key>.parquet` next to a `<key>.json` file holding
+    the validators (ETag, Last-Modified, content hash) of the last download.
+    Within `ttl` seconds the cached frame is returned without any network call,
+    afterwards the sheet is revalidated with a conditional request. If Google
+    Sheets is slow or unreachable the last good copy is served. `read` parses
+    a download, the cached frame is its result, so every key must always be
+    read the same way.
+    """
+
+    def __init__(self, directory: str | pathlib.Path, ttl: int = 300, timeout: float = 10.0):
+        self.directory = pathlib.Path(directory)
+        self.ttl = ttl
+        self.timeout = timeout
+        self._memory: dict[str, tuple[int, pd.DataFrame]] = {}
+        self._locks: defaultdict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    def get(self, key: str, url: str, read: Callable[[bytes], pd.DataFrame] = read_csv) -> pd.DataFrame:
+        with self._locks[key]:
+            meta = self._read_meta(key)
+            if meta and self._data_path(key).exists() and time.time() - meta['checked'] < self.ttl:
+                METRICS.inc('cache_requests_total', cache='sheets', result='hit')
+                return self._load(key)
+            return self._revalidate(key, url, meta, read)
+
+    def invalidate(self, key: str):
+        with self._locks[key]:
+            self._meta_path(key).unlink(missing_ok=True)
+
+    def _revalidate(self, key: str, url: str, meta: dict | None, read: Callable[[bytes], pd.DataFrame]) -> pd.DataFrame:
+        cached = meta is not None and self._data_path(key).exists()
+        headers = {}
+        if cached and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if cached and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        try:
+            with METRICS.timer('outbound_request_seconds', dependency='google_sheets', operation='export'):
+                response = requests.get(url, headers=headers, timeout=self.timeout)
+                response.raise_for_status()
+        except requests.RequestException as e:
+            return self._stale(key, meta, e)
+
+        digest = hashlib.sha256(response.content).hexdigest() if response.status_code != 304 else None
+        if cached and (response.status_code == 304 or digest == meta.get('sha256')):
+            METRICS.inc('cache_requests_total', cache='sheets', result='revalidated')
+            LOGGER.debug('Sheet %s not modified', key)
+            self._write_meta(key, {**meta, 'checked': time.time()})
+            return self._load(key)
+
+        try:
+            df = read(response.content)
+        except ValueError as e:
+            # e.g. an HTML interstitial instead of the export or a malformed sheet
+            return self._stale(key, meta, e)
+        METRICS.inc('cache_requests_total', cache='sheets', result='miss')
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with atomic_path(self._data_path(key)) as tmp:
+            df.to_parquet(tmp, index=False)
+        self._write_meta(key, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': digest,
+            'checked': time.time(),
+        })
+        LOGGER.info('Downloaded sheet %s (%d rows)', key, len(df))
+        return df.copy()
+
+    def _stale(self, key: str, meta: dict | None, error: Exception) -> pd.DataFrame:
+        """The last good copy of `key` after a failed refresh, raises `error` if there is none."""
+        if meta is None or not self._data_path(key).exists():
+            raise error
+        METRICS.inc('cache_requests_total', cache='sheets', result='stale')
+        LOGGER.warning('Could not refresh sheet %s, serving cached copy: %s', key, error)
+        # back off until the next ttl expiry instead of retrying on every rerun
+        self._write_meta(key, {**meta, 'checked': time.time()})
+        return self._load(key)
+
+    def _load(self, key: str) -> pd.DataFrame:
+        path = self._data_path(key)
+        mtime = path.stat().st_mtime_ns
+        hit = self._memory.get(key)
+        if hit is None or hit[0] != mtime:
+            hit = (mtime, pd.read_parquet(path))
+            self._memory[key] = hit
+        return hit[1].copy()
+
+    def _read_meta(self, key: str) -> dict | None:
+        try:
+            with open(self._meta_path(key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key: str, meta: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with atomic_path(self._meta_path(key)) as tmp, open(tmp, 'w') as f:
+            json.dump(meta, f)
+
+    def _data_path(self, key: str) -> pathlib.Path:
+        return self.directory / f'{key}.parquet'
+
+    def _meta_path(self, key: str) -> pathlib.Path:
+        return self.directory / f'{key}.json'
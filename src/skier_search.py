@@ -0,0 +1,98 @@
+import unicodedata
+from collections import defaultdict
+from typing import Sequence
+import numpy as np
+import pandas as pd
+
+
+# number of matches sent to the selection widget
+TOP_K = 50
+
+
+def fold(text: str) -> str:
+    """Lower case ASCII, e.g. `Müller` becomes `muller`."""
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+
+
+def _grams(word: str) -> set[str]:
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class SkierIndex:
+    """Search over the skiers of a race, built once per race.
+
+    Names and the optional label columns (e.g. club or category) are folded
+    with `fold` and split into words. Every word is kept in a sorted array
+    for prefix lookups, words of three or more characters are also indexed
+    by their trigrams. A query matches the skiers that contain each of its
+    words, short words (less than three characters) must start a word.
+    Matches are ranked by the number of query words that start a word, then
+    by name.
+    """
+
+    def __init__(self, skiers: Sequence[str], labels: pd.DataFrame | None = None):
+        self.skiers = np.asarray(skiers, dtype=object)
+        names = [fold(str(skier)) for skier in self.skiers]
+        extra = [''] * len(names) if labels is None or labels.empty else \
+            labels.fillna('').astype(str).agg(' '.join, axis=1).map(fold).tolist()
+        self._texts = [f'{name} {other}' for name, other in zip(names, extra)]
+        grams: defaultdict[str, list[int]] = defaultdict(list)
+        words: list[tuple[str, int]] = []
+        for row, text in enumerate(self._texts):
+            for word in set(text.split()):
+                words.append((word, row))
+                for gram in _grams(word):
+                    grams[gram].append(row)
+        self._grams = {gram: np.unique(rows) for gram, rows in grams.items()}
+        words.sort()
+        self._words = np.array([word for word, _ in words], dtype=object)
+        self._word_rows = np.array([row for _, row in words], dtype=np.int64)
+        # position of every skier in name order, ties of the ranking are broken by it
+        self._order = np.array(sorted(range(len(names)), key=lambda row: names[row]), dtype=np.int64)
+        self._rank = np.empty(len(names), dtype=np.int64)
+        self._rank[self._order] = np.arange(len(names))
+
+    def __len__(self) -> int:
+        return len(self.skiers)
+
+    def search(self, query: str, k: int = TOP_K) -> list[str]:
+        """The `k` best matches of `query`, the first `k` skiers by name if it is empty."""
+        terms = fold(query).split()
+        if not terms:
+            return self.skiers[self._order[:k]].tolist()
+        matches = np.ones(len(self.skiers), dtype=bool)
+        score = np.zeros(len(self.skiers), dtype=np.int64)
+        for term in sorted(terms, key=len, reverse=True):
+            found, starts = self._lookup(term)
+            matches &= found
+            score += starts
+        rows = np.flatnonzero(matches)
+        # fewer words starting with a query word rank lower, then by name
+        key = (len(terms) - score[rows]) * len(self.skiers) + self._rank[rows]
+        if len(rows) > k:
+            best = np.argpartition(key, k)[:k]
+            rows, key = rows[best], key[best]
+        return self.skiers[rows[np.argsort(key)]].tolist()
+
+    def _lookup(self, term: str) -> tuple[np.ndarray, np.ndarray]:
+        """Masks of the skiers matching `term` and of those with a word starting with it."""
+        n = len(self.skiers)
+        first, last = np.searchsorted(self._words, [term, term + '\x7f'])
+        starts = np.zeros(n, dtype=bool)
+        starts[self._word_rows[first:last]] = True
+        if len(term) < 3:
+            return starts, starts
+        postings = sorted((self._grams.get(gram, np.empty(0, dtype=np.int64)) for gram in _grams(term)), key=len)
+        rows = postings[0]
+        for posting in postings[1:]:
+            mask = np.zeros(n, dtype=bool)
+            mask[posting] = True
+            rows = rows[mask[rows]]
+        found = starts.copy()
+        if len(term) > 3:
+            # the trigrams may come from different words or positions
+            texts = self._texts
+            found[[row for row in rows[~starts[rows]].tolist() if term in texts[row]]] = True
+        else:
+            found[rows] = True
+        return found, starts
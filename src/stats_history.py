@@ -0,0 +1,98 @@
+import fcntl
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from datetime import datetime
+from atomic_file import atomic_path
+from models.year_stats import YearStats
+
+
+class YearStatsHistory:
+    """Append-only history of `YearStats` snapshots.
+
+    Every version is one compact JSON line (`date`, `hash`, `stats`) in
+    `history_file`. A snapshot is only written if its content hash differs from
+    the latest version, in which case `latest_file` is replaced by it as well.
+    Writers are serialized with a file lock, so concurrent sessions can save
+    the same statistics without racing.
+    """
+
+    def __init__(self, history_file: str | pathlib.Path, latest_file: str | pathlib.Path | None = None):
+        self.history_file = pathlib.Path(history_file)
+        self.latest_file = pathlib.Path(latest_file) if latest_file else None
+        self._lock = threading.Lock()
+        self._cache: tuple[int, dict] | None = None
+
+    def save(self, stats: list[YearStats]) -> bool:
+        """Stores `stats` as a new version, returns `False` if nothing changed."""
+        data = [stat.model_dump() for stat in stats]
+        digest = content_hash(data)
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.history_file, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                last = self._last_version()
+                if last and last['hash'] == digest:
+                    return False
+                version = {'date': datetime.now().isoformat(timespec='seconds'), 'hash': digest, 'stats': data}
+                f.write(json.dumps(version, separators=(',', ':')) + '\n')
+                f.flush()
+                if self.latest_file:
+                    with atomic_path(self.latest_file) as tmp, open(tmp, 'w') as latest:
+                        json.dump(data, latest, indent=2)
+                return True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def latest(self) -> list[YearStats] | None:
+        """The most recent snapshot, without reading the whole history."""
+        version = self._last_version()
+        if version:
+            return [YearStats(**stat) for stat in version['stats']]
+        if self.latest_file and self.latest_file.exists():
+            with open(self.latest_file, 'r') as f:
+                return [YearStats(**stat) for stat in json.load(f)]
+        return None
+
+    def versions(self) -> list[tuple[datetime, str]]:
+        """Date and content hash of every stored version, oldest first."""
+        if not self.history_file.exists():
+            return []
+        with open(self.history_file, 'r') as f:
+            versions = [json.loads(line) for line in f if line.strip()]
+        return [(datetime.fromisoformat(v['date']), v['hash']) for v in versions]
+
+    def _last_version(self) -> dict | None:
+        try:
+            mtime = self.history_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if self._cache and self._cache[0] == mtime:
+            return self._cache[1]
+        line = _last_line(self.history_file)
+        version = json.loads(line) if line else None
+        self._cache = (mtime, version)
+        return version
+
+
+def content_hash(data: list[dict]) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def _last_line(path: pathlib.Path, block: int = 1 << 16) -> str | None:
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b''
+        while end > 0:
+            start = max(0, end - block)
+            f.seek(start)
+            data = f.read(end - start) + data
+            lines = data.rstrip(b'\n').split(b'\n')
+            if len(lines) > 1 or start == 0:
+                line = lines[-1].decode()
+                return line or None
+            end = start
+    return None
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+from metrics import METRICS
+
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe in-process cache with a time to live and LRU eviction.
+
+    Concurrent misses for the same key are coalesced, so only one caller runs
+    the loader while the others wait for its result. Hits and misses of a
+    named cache are counted in `cache_requests_total`.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 128, name: str | None = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: dict[K, threading.Lock] = {}
+
+    def get(self, key: K, loader: Callable[[], V]) -> V:
+        with self._lock:
+            hit = self._lookup(key)
+            if hit is not None:
+                self._count('hit')
+                return hit[1]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                # another thread may have loaded the value while we were waiting
+                hit = self._lookup(key)
+                if hit is not None:
+                    self._count('hit')
+                    return hit[1]
+            self._count('miss')
+            value = loader()
+            with self._lock:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._loading.pop(evicted, None)
+            return value
+
+    def invalidate(self, key: K | None = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            # locks of running loads stay, their waiters coalesce on them
+            for k in list(self._loading) if key is None else [key]:
+                if k in self._loading and not self._loading[k].locked():
+                    del self._loading[k]
+
+    def age(self, key: K) -> float | None:
+        """Seconds since `key` was loaded, `None` if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else time.monotonic() - entry[0]
+
+    def keys(self) -> list[K]:
+        with self._lock:
+            return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _count(self, result: str):
+        if self.name:
+            METRICS.inc('cache_requests_total', cache=self.name, result=result)
+
+    def _lookup(self, key: K) -> tuple[float, V] | None:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        self._entries.move_to_end(key)
+        return entry
@@ -1,7 +1,68 @@
+import hmac
+import os
+import pathlib
+import time
+from contextlib import contextmanager
+from typing import Iterator
 import streamlit as st
+from pydantic_settings import BaseSettings
+from metrics import METRICS
+
+
+CACHE_PATH = pathlib.Path(__file__).resolve().parent.parent / '.cache'
+
+
+class MetricsConfig(BaseSettings):
+    file: str = str(CACHE_PATH / 'metrics.prom')
+    interval: float = 15.0
+
+    class Config:
+        env_file = '.env'
+        env_prefix = 'METRICS_'
+
+
+metrics_cfg = MetricsConfig()
+METRICS.configure(metrics_cfg.file, metrics_cfg.interval)
+
 
 def page_config():
     st.set_page_config(
         page_title='LC ZH DS',
         page_icon=':palm_tree:',
-    )
\ No newline at end of file
+    )
+
+
+@contextmanager
+def page_run(page: str) -> Iterator[None]:
+    """Records the total run time of a page script, including runs ended by `st.stop` or `st.rerun`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        METRICS.observe('page_run_seconds', time.perf_counter() - start, page=page)
+        METRICS.export()
+
+
+def check_password():
+    """Returns `True` if the user had the correct password."""
+    pwd_key = 'INTERNA_PASSWORD'
+    ok_key = 'password_ok'
+    def password_entered():
+        """Checks whether a password entered by the user is correct."""
+        if hmac.compare_digest(st.session_state[pwd_key], os.environ[pwd_key]):
+            st.session_state[ok_key] = True
+            del st.session_state[pwd_key]  # Don't store the password.
+        else:
+            st.session_state[ok_key] = False
+
+    # Return True if the password is validated.
+    if st.session_state.get(ok_key, False):
+        return True
+
+    # Show input for password.
+    st.text_input(
+        'Passwort', type='password', on_change=password_entered, key=pwd_key
+    )
+    if ok_key in st.session_state:
+        st.error('😕 Password incorrect')
+    return False
@@ -0,0 +1,167 @@
+import fcntl
+import json
+import pathlib
+import threading
+import time
+from functools import partial
+from typing import Callable
+import pandas as pd
+from streamlit.logger import get_logger
+from atomic_file import atomic_path
+from metrics import METRICS
+from ttl_cache import TTLCache
+
+
+LOGGER = get_logger(__name__)
+
+
+class ForecastCache:
+    """Persistent forecast cache keyed by rounded coordinates.
+
+    Locations are `'<lat>,<lon>'` strings, rounded to `precision` decimals, so
+    checkpoints at the same place (also across races) share one entry. Entries
+    are kept in memory and as Parquet files on disk, so they survive restarts.
+    Both levels are bounded to `maxsize` entries with LRU eviction. A stale
+    entry is still served if the forecast cannot be refreshed, the refresh is
+    then not tried again for `retry_after` seconds, doubled on every further
+    failure up to `ttl`. `index.json` is shared with other processes (e.g. the
+    precompute job), it is re-read and written under a file lock.
+    """
+
+    def __init__(self, directory: str | pathlib.Path, ttl: float = 3600, maxsize: int = 64, precision: int = 3,
+                 retry_after: float = 300):
+        self.directory = pathlib.Path(directory)
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.precision = precision
+        self.retry_after = retry_after
+        self._memory: TTLCache[str, tuple[float, pd.DataFrame]] = TTLCache(ttl, maxsize, name='forecast_memory')
+        self._lock = threading.Lock()
+        self._index_mtime = self._mtime()
+        self._index: dict[str, dict[str, float]] = self._read_index()
+
+    def location(self, location: str) -> str:
+        lat, lon = (float(v) for v in location.split(',')[:2])
+        return f'{round(lat, self.precision)},{round(lon, self.precision)}'
+
+    def get(self, location: str, loader: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+        """Cached forecast of `location`, `loader` is called with the rounded location on a miss."""
+        key = self.location(location)
+        fetched, df = self._memory.get(key, lambda: self._load(key, loader))
+        if time.time() - fetched >= self.ttl and not self._backing_off(key):
+            # loaded from disk close to its expiry, or a stale copy served because the refresh failed
+            self._memory.invalidate(key)
+            fetched, df = self._memory.get(key, lambda: self._load(key, loader))
+        return df
+
+    def refresh(self, location: str, loader: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+        """Fetches the forecast of `location` again, even if the cached one is still fresh."""
+        key = self.location(location)
+        _, df = self._load(key, loader, force=True)
+        self._memory.invalidate(key)
+        return df
+
+    def age(self, location: str) -> float | None:
+        """Seconds since the forecast of `location` was fetched, `None` if it is not cached."""
+        with self._lock:
+            entry = self._current_index().get(self.location(location))
+        return None if entry is None else time.time() - entry['fetched']
+
+    def locations(self) -> list[str]:
+        with self._lock:
+            return list(self._current_index())
+
+    def _load(self, key: str, loader: Callable[[str], pd.DataFrame], force: bool = False) -> tuple[float, pd.DataFrame]:
+        with self._lock:
+            entry = self._current_index().get(key)
+        path = self._path(key)
+        cached = entry is not None and path.exists()
+        if not force and cached and time.time() - entry['fetched'] < self.ttl:
+            METRICS.inc('cache_requests_total', cache='forecast_disk', result='hit')
+            self._touch(key)
+            return entry['fetched'], pd.read_parquet(path)
+        if not force and cached and entry.get('retry', 0) > time.time():
+            # the last refresh failed, the API is not asked again before the retry time
+            METRICS.inc('cache_requests_total', cache='forecast_disk', result='stale')
+            return entry['fetched'], pd.read_parquet(path)
+        try:
+            df = loader(key)
+        except Exception as e:
+            if cached:
+                self._update_index(partial(self._failed, key))
+            if force or not cached:
+                raise
+            METRICS.inc('cache_requests_total', cache='forecast_disk', result='stale')
+            LOGGER.warning('Could not refresh forecast for %s, serving cached copy: %s', key, e)
+            return entry['fetched'], pd.read_parquet(path)
+        METRICS.inc('cache_requests_total', cache='forecast_disk', result='miss')
+        fetched = time.time()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with atomic_path(path) as tmp:
+            df.to_parquet(tmp)
+        self._update_index(lambda index: index.update({key: {'fetched': fetched, 'used': fetched}}))
+        return fetched, df
+
+    def _failed(self, key: str, index: dict[str, dict[str, float]]):
+        if key in index:
+            failures = index[key].get('failures', 0) + 1
+            retry = time.time() + min(self.retry_after * 2 ** (failures - 1), self.ttl)
+            index[key].update(failures=failures, retry=retry)
+
+    def _backing_off(self, key: str) -> bool:
+        with self._lock:
+            entry = self._current_index().get(key)
+        return entry is not None and entry.get('retry', 0) > time.time()
+
+    def _touch(self, key: str):
+        def touch(index: dict[str, dict[str, float]]):
+            if key in index:
+                index[key]['used'] = time.time()
+        self._update_index(touch)
+
+    def _update_index(self, change: Callable[[dict[str, dict[str, float]]], None]):
+        """Applies `change` to the latest index on disk, other processes may have changed it meanwhile."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.directory / 'index.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                index = self._read_index()
+                change(index)
+                self._evict(index)
+                self._write_index(index)
+                self._index, self._index_mtime = index, self._mtime()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _evict(self, index: dict[str, dict[str, float]]):
+        while len(index) > self.maxsize:
+            oldest = min(index, key=lambda k: index[k]['used'])
+            del index[oldest]
+            self._path(oldest).unlink(missing_ok=True)
+
+    def _current_index(self) -> dict[str, dict[str, float]]:
+        # picks up forecasts fetched by other processes
+        mtime = self._mtime()
+        if mtime != self._index_mtime:
+            self._index, self._index_mtime = self._read_index(), mtime
+        return self._index
+
+    def _mtime(self) -> int | None:
+        try:
+            return (self.directory / 'index.json').stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read_index(self) -> dict[str, dict[str, float]]:
+        try:
+            with open(self.directory / 'index.json', 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index: dict[str, dict[str, float]]):
+        with atomic_path(self.directory / 'index.json') as tmp, open(tmp, 'w') as f:
+            json.dump(index, f)
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f'{key.replace(",", "_")}.parquet'
@@ -0,0 +1,126 @@
+import datetime as dt
+import fcntl
+import io
+import json
+import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+from urllib import parse
+import pandas as pd
+from requests import RequestException, Session
+from requests.adapters import HTTPAdapter
+from streamlit.logger import get_logger
+from metrics import METRICS
+
+
+LOGGER = get_logger(__name__)
+
+
+def parse_timeline_csv(text: str) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(text), delimiter=',', index_col='datetime', parse_dates=True)
+
+
+class QuotaExceeded(RequestException):
+    pass
+
+
+class DailyQuota:
+    """Number of requests per UTC day, counted in the JSON file `path`.
+
+    The file is updated under a file lock, so all processes using it (the app
+    and the precompute job) share one quota.
+    """
+
+    def __init__(self, path: str | pathlib.Path, limit: int):
+        self.path = pathlib.Path(path)
+        self.limit = limit
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Counts a request, returns `False` without counting it if the quota is used up."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                used = self._used(f.read())
+                if used >= self.limit:
+                    return False
+                f.seek(0)
+                f.truncate()
+                json.dump({'date': _today(), 'requests': used + 1}, f)
+                return True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def used(self) -> int:
+        try:
+            return self._used(self.path.read_text())
+        except OSError:
+            return 0
+
+    def _used(self, text: str) -> int:
+        try:
+            state = json.loads(text)
+        except ValueError:
+            return 0
+        return state['requests'] if state.get('date') == _today() else 0
+
+
+def _today() -> str:
+    return dt.datetime.now(dt.timezone.utc).date().isoformat()
+
+
+class ForecastClient:
+    """VisualCrossing timeline client sharing one pooled keep-alive session.
+
+    Every request is counted in `quota`, if given. Once it is used up the
+    requests fail with `QuotaExceeded` until the next day.
+    """
+
+    def __init__(self, api_url: str, api_key: str, timeout: float = 10.0, max_workers: int = 8,
+                 quota: DailyQuota | None = None):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.quota = quota
+        self.session = Session()
+        self.session.mount(api_url, HTTPAdapter(pool_maxsize=max_workers))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='forecast')
+
+    def load(self, location: str) -> pd.DataFrame:
+        return self._timeline(parse.quote_plus(location))
+
+    def load_day(self, location: str, date: dt.date) -> pd.DataFrame:
+        """Hourly weather of `location` (coordinates or a place name) on a past or future `date`."""
+        return self._timeline(f'{parse.quote_plus(location)}/{date.isoformat()}')
+
+    def _timeline(self, path: str) -> pd.DataFrame:
+        if self.quota and not self.quota.take():
+            raise QuotaExceeded(f'Daily quota of {self.quota.limit} forecast requests used up')
+        with METRICS.timer('outbound_request_seconds', dependency='visualcrossing', operation='timeline'):
+            response = self.session.get(
+                f'{self.api_url}/timeline/{path}',
+                params={'unitGroup': 'metric', 'include': 'hours', 'key': self.api_key, 'contentType': 'csv'},
+                timeout=self.timeout)
+            response.raise_for_status()
+        return parse_timeline_csv(response.text)
+
+    def load_many(self, locations: Iterable[str],
+                  loader: Callable[[str], pd.DataFrame] | None = None) -> dict[str, pd.DataFrame | None]:
+        """Loads all `locations` concurrently, failed locations map to `None`.
+
+        `loader` defaults to `load` and can be used to put a cache in front of it.
+        """
+        loader = loader or self.load
+        locations = list(dict.fromkeys(locations))
+        futures = {location: self._executor.submit(loader, location) for location in locations}
+        forecasts: dict[str, pd.DataFrame | None] = {}
+        for location, future in futures.items():
+            try:
+                forecasts[location] = future.result()
+            except (RequestException, ValueError) as e:
+                LOGGER.warning('Could not load forecast for %s: %s', location, e)
+                forecasts[location] = None
+        return forecasts
@@ -0,0 +1,88 @@
+import datetime as dt
+import threading
+from typing import Callable
+from requests import RequestException
+from streamlit.logger import get_logger
+from models.weather import Race
+from weather.cache import ForecastCache
+from weather.forecast import ForecastClient, QuotaExceeded
+
+
+LOGGER = get_logger(__name__)
+
+
+class ForecastPrewarmer:
+    """Background job keeping the forecasts of all upcoming races warm.
+
+    Every `interval` seconds the checkpoints of all races starting within the
+    next `horizon_days` are refreshed, if their cached forecast would expire
+    before the next run. Requests are staggered by `stagger` seconds, a run
+    stops once the daily quota of the client is used up.
+    """
+
+    def __init__(self, cache: ForecastCache, client: ForecastClient, races: Callable[[], list[Race]],
+                 interval: float = 1800, stagger: float = 2.0, horizon_days: int = 15):
+        self.cache = cache
+        self.client = client
+        self.races = races
+        self.interval = interval
+        self.stagger = stagger
+        self.horizon_days = horizon_days
+        self.last_run: dt.datetime | None = None
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        with self._thread_lock:
+            if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='forecast-prewarm', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def locations(self, now: dt.datetime | None = None) -> list[str]:
+        """Checkpoint locations of all races starting within the horizon."""
+        now = now or dt.datetime.now()
+        horizon = now + dt.timedelta(days=self.horizon_days)
+        locations = [
+            self.cache.location(checkpoint.location)
+            for race in self.races() if now <= race.start <= horizon
+            for checkpoint in race.checkpoints]
+        return list(dict.fromkeys(locations))
+
+    def run_once(self) -> int:
+        """Refreshes all forecasts expiring before the next run, returns the number of requests."""
+        requests = 0
+        for location in self.locations():
+            age = self.cache.age(location)
+            if age is not None and age + self.interval < self.cache.ttl:
+                continue
+            if requests and self._stop.wait(self.stagger):
+                break
+            try:
+                self.cache.refresh(location, self.client.load)
+            except QuotaExceeded as e:
+                LOGGER.warning('Stopped pre-fetching forecasts: %s', e)
+                break
+            except (RequestException, ValueError) as e:
+                LOGGER.warning('Could not pre-fetch forecast for %s: %s', location, e)
+            requests += 1
+        self.last_run = dt.datetime.now()
+        return requests
+
+    def status(self) -> dict[str, float | None]:
+        """Age in seconds of the cached forecast of every pre-fetched location."""
+        return {location: self.cache.age(location) for location in self.locations()}
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                requests = self.run_once()
+                LOGGER.info('Pre-fetched %d forecasts', requests)
+            except Exception as e:
+                LOGGER.error('Forecast pre-fetching failed: %s', e)
+            self._stop.wait(self.interval)
@@ -0,0 +1,103 @@
+import datetime as dt
+from typing import Sequence
+import numpy as np
+import pandas as pd
+from models.weather import Checkpoint, Race
+
+
+# wind direction is interpolated as a unit vector, so 350° and 10° average to 0° and not 180°
+CIRCULAR = {'winddir'}
+
+
+class ForecastTimeline:
+    """Forecasts of all checkpoints of a race on one common time axis.
+
+    Numeric fields are linearly interpolated at the exact passage time of
+    every checkpoint, other fields (e.g. `conditions`) take the value of the
+    nearest hour. `at` evaluates a whole grid of race times in one call, so
+    comparing finishing times is a single array operation.
+    """
+
+    def __init__(self, race: Race, forecasts: dict[Checkpoint, pd.DataFrame | None], columns: Sequence[str]):
+        self.race = race
+        self.columns = list(columns)
+        frames = [f for f in forecasts.values() if f is not None]
+        index = frames[0].index.append([f.index for f in frames[1:]]).unique().sort_values() if frames else pd.DatetimeIndex([])
+        self.axis = index.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        self.numeric = [c for c in self.columns if all(pd.api.types.is_numeric_dtype(f[c]) for f in frames)]
+        self.other = [c for c in self.columns if c not in self.numeric]
+        self.distance = np.array([c.distance for c in race.checkpoints], dtype=np.float64)
+
+        n_checkpoints, n_times = len(race.checkpoints), len(self.axis)
+        self.values = np.full((n_checkpoints, n_times, len(self.numeric)), np.nan)
+        self.labels = np.full((n_checkpoints, n_times, len(self.other)), None, dtype=object)
+        for i, checkpoint in enumerate(race.checkpoints):
+            frame = forecasts.get(checkpoint)
+            if frame is None:
+                continue
+            frame = frame[~frame.index.duplicated()]
+            aligned = frame[self.numeric].reindex(index)
+            self.values[i] = aligned.interpolate(method='index', limit_direction='both').to_numpy(dtype=np.float64)
+            nearest = frame.index.get_indexer(index, method='nearest')
+            self.labels[i] = frame[self.other].to_numpy(dtype=object)[nearest]
+
+    def passage_times(self, race_times: Sequence[dt.timedelta] | np.ndarray) -> np.ndarray:
+        """Passage times (int64 ns) with shape (race times, checkpoints), assuming an even pace."""
+        race_ns = pd.to_timedelta(race_times).to_numpy(dtype='timedelta64[ns]').view(np.int64)
+        start = pd.Timestamp(self.race.start).value
+        share = self.distance / self.race.distance
+        return start + np.rint(race_ns[:, None] * share[None, :]).astype(np.int64)
+
+    def at(self, race_times: Sequence[dt.timedelta] | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Numeric values (race times, checkpoints, numeric columns) and nearest-hour labels."""
+        t = self.passage_times(race_times)
+        shape = t.shape + (len(self.numeric),)
+        if len(self.axis) == 0:
+            return np.full(shape, np.nan), np.full(t.shape + (len(self.other),), None, dtype=object)
+        # fractional position on the time axis, clamped to the forecast range like np.interp
+        if len(self.axis) == 1:
+            lo = hi = np.zeros(t.shape, dtype=np.intp)
+        else:
+            hi = np.clip(np.searchsorted(self.axis, t, side='left'), 1, len(self.axis) - 1)
+            lo = hi - 1
+        span = (self.axis[hi] - self.axis[lo]).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            w = np.clip(np.where(span > 0, (t - self.axis[lo]) / span, 0.0), 0.0, 1.0)[..., None]
+        checkpoint = np.arange(t.shape[1])[None, :]
+        a, b = self.values[checkpoint, lo], self.values[checkpoint, hi]
+        values = a + (b - a) * w
+        for j, column in enumerate(self.numeric):
+            if column in CIRCULAR:
+                rad_a, rad_b = np.deg2rad(a[..., j]), np.deg2rad(b[..., j])
+                x = np.cos(rad_a) + (np.cos(rad_b) - np.cos(rad_a)) * w[..., 0]
+                y = np.sin(rad_a) + (np.sin(rad_b) - np.sin(rad_a)) * w[..., 0]
+                values[..., j] = np.round(np.rad2deg(np.arctan2(y, x)), 6) % 360
+        nearest = np.where(w[..., 0] < 0.5, lo, hi)
+        return values, self.labels[checkpoint, nearest]
+
+    def table(self, race_time: dt.timedelta) -> pd.DataFrame:
+        """Forecast per checkpoint for one race time, indexed by checkpoint name."""
+        values, labels = self.at([race_time])
+        t = pd.to_datetime(self.passage_times([race_time])[0])
+        df = pd.DataFrame(values[0], columns=self.numeric)
+        for j, column in enumerate(self.other):
+            df[column] = labels[0][:, j]
+        df.insert(0, 'time', [ts.time() for ts in t])
+        df.insert(0, 'km', self.distance)
+        df.index = pd.Index([c.name for c in self.race.checkpoints], name='name')
+        return df[['km', 'time'] + self.columns]
+
+    def compare(self, race_times: Sequence[dt.timedelta], column: str) -> pd.DataFrame:
+        """`column` along the course (long format: km, race time, value) for several race times."""
+        values, labels = self.at(race_times)
+        data = values[..., self.numeric.index(column)] if column in self.numeric else labels[..., self.other.index(column)]
+        return pd.DataFrame({
+            'km': np.tile(self.distance, len(race_times)),
+            'race time': np.repeat([_format(t) for t in race_times], len(self.distance)),
+            column: data.ravel(),
+        })
+
+
+def _format(race_time: dt.timedelta) -> str:
+    minutes = int(race_time.total_seconds() // 60)
+    return f'{minutes // 60}:{minutes % 60:02d} h'
@@ -0,0 +1,86 @@
+import datetime as dt
+import pathlib
+import pandas as pd
+
+from functools import cache
+from pydantic_settings import BaseSettings
+from data import artifacts, artifacts_cfg
+from models.weather import Checkpoint, Race as WeatherRace
+from resource_registry import yaml_resource
+from utils import CACHE_PATH
+from weather.cache import ForecastCache
+from weather.forecast import DailyQuota, ForecastClient
+from weather.prewarm import ForecastPrewarmer
+
+
+class VisualCrossingConfig(BaseSettings):
+    apiUrl: str = 'https://weather.visualcrossing.com/VisualCrossingWebServices/rest/services'
+    apiKey: str = ''
+    timeout: float = 10.0
+    cacheDir: str = str(CACHE_PATH / 'forecasts')
+    ttl: int = 3600
+    cacheSize: int = 64
+    retryAfter: int = 300
+    prewarmInterval: int = 1800
+    dailyQuota: int = 500
+    stagger: float = 2.0
+
+    class Config:
+        env_file = '.env'
+        env_prefix = 'VISUALCROSSING_'
+
+
+vc_cfg = VisualCrossingConfig()
+
+
+@cache
+def get_forecast_client() -> ForecastClient:
+    return ForecastClient(vc_cfg.apiUrl, vc_cfg.apiKey, timeout=vc_cfg.timeout,
+                          quota=DailyQuota(pathlib.Path(vc_cfg.cacheDir) / 'quota.json', vc_cfg.dailyQuota))
+
+@cache
+def get_forecast_cache() -> ForecastCache:
+    return ForecastCache(vc_cfg.cacheDir, ttl=vc_cfg.ttl, maxsize=vc_cfg.cacheSize, retry_after=vc_cfg.retryAfter)
+
+_weather_races = yaml_resource('weather/races.yaml', lambda races: [WeatherRace(**race) for race in races or []])
+
+def load_weather_races() -> list[WeatherRace]:
+    return _weather_races.get()
+
+@cache
+def _forecast_prewarmer() -> ForecastPrewarmer:
+    return ForecastPrewarmer(get_forecast_cache(), get_forecast_client(), load_weather_races,
+                             interval=vc_cfg.prewarmInterval, stagger=vc_cfg.stagger)
+
+def get_forecast_prewarmer() -> ForecastPrewarmer:
+    """The prewarmer of this process, started on first use unless the precompute job prewarms."""
+    prewarmer = _forecast_prewarmer()
+    if not artifacts_cfg.precomputed:
+        prewarmer.start()
+    return prewarmer
+
+def load_forecast(location: str) -> pd.DataFrame:
+    return get_forecast_cache().get(location, get_forecast_client().load)
+
+def load_weather_day(location: str, date: dt.date) -> pd.DataFrame:
+    return get_forecast_client().load_day(location, date)
+
+def load_forecasts(checkpoints: list[Checkpoint]) -> dict[Checkpoint, pd.DataFrame | None]:
+    forecasts = get_forecast_client().load_many([c.location for c in checkpoints], load_forecast)
+    return {checkpoint: forecasts[checkpoint.location] for checkpoint in checkpoints}
+
+def load_race_forecasts(race: WeatherRace) -> dict[Checkpoint, pd.DataFrame | None]:
+    """Forecasts of all checkpoints of `race`, from the precompute job if recent enough."""
+    artifact = artifacts.latest(f'forecasts/{race.name}', max_age=min(artifacts_cfg.maxAge, vc_cfg.ttl))
+    if artifact is None:
+        return load_forecasts(race.checkpoints)
+    frame = artifact.frame()
+    present = set(frame.index.get_level_values('checkpoint'))
+    return {c: frame.xs(i, level='checkpoint') if i in present else None for i, c in enumerate(race.checkpoints)}
+
+def publish_race_forecasts(race: WeatherRace):
+    # checkpoints are identified by position, several of them may share a location
+    forecasts = load_forecasts(race.checkpoints)
+    frames = {i: forecasts[c] for i, c in enumerate(race.checkpoints) if forecasts[c] is not None}
+    if frames:
+        artifacts.publish_frame(f'forecasts/{race.name}', pd.concat(frames, names=['checkpoint']))
@@ -0,0 +1,29 @@
+from typing import Any
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from metrics import METRICS
+from urllib3.util.retry import Retry
+
+
+class WeblingClient:
+    """Process-wide Webling API client.
+
+    All calls share one keep-alive session, idempotent requests are retried
+    on gateway errors. The data is read from the `WeblingMirror`, which uses
+    this client to sync.
+    """
+
+    def __init__(self, api_url: str, api_key: str, timeout: float = 10.0, pool_size: int = 10):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = Session()
+        retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=['GET'])
+        self.session.mount(api_url, HTTPAdapter(pool_maxsize=pool_size, max_retries=retries))
+
+    def get(self, route: str, params: dict[str, Any] | None = None) -> Response:
+        params = {**(params or {}), 'apikey': self.api_key}
+        with METRICS.timer('outbound_request_seconds', dependency='webling', operation=route.split('/')[0]):
+            response = self.session.get(f'{self.api_url}/{route}', params=params, timeout=self.timeout)
+            response.raise_for_status()
+        return response
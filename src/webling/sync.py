@@ -0,0 +1,223 @@
+import pathlib
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date
+from typing import Any
+from requests import HTTPError
+from streamlit.logger import get_logger
+from webling.client import WeblingClient
+from webling.members import Member, Status
+from webling.tables import ARTICLES, MEMBER_GROUPS, MEMBERS, ArticleTable, MemberTable
+
+
+LOGGER = get_logger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS member (
+    id INTEGER PRIMARY KEY,
+    talent INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT,
+    email TEXT,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    heart_rate INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS member_email ON member (email, status);
+CREATE INDEX IF NOT EXISTS member_status ON member (status);
+CREATE TABLE IF NOT EXISTS membergroup (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS membergroup_member (
+    group_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL,
+    PRIMARY KEY (group_id, member_id)
+);
+CREATE INDEX IF NOT EXISTS membergroup_member_member ON membergroup_member (member_id);
+CREATE TABLE IF NOT EXISTS article (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+MEMBER_COLUMNS = 'talent, status, start, end, email, first_name, last_name, heart_rate'
+
+
+class ResyncRequired(Exception):
+    pass
+
+
+class WeblingMirror:
+    """Local SQLite mirror of the Webling members, member groups and articles.
+
+    The first sync loads every object with `format=full`. Afterwards only the
+    objects reported by Webling's change tracking (`replicate/<revision>`) are
+    fetched again. Pages read from the indexed local tables while a background
+    thread keeps them in sync.
+    """
+
+    TYPES = ('member', 'membergroup', 'article')
+    CHUNK_SIZE = 100
+
+    def __init__(self, client: WeblingClient, path: str | pathlib.Path):
+        self.client = client
+        self.path = pathlib.Path(path)
+        self._sync_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+
+    def start(self, interval: float):
+        """Starts the background sync thread, if it is not running yet."""
+        with self._thread_lock:
+            if interval <= 0 or (self._thread and self._thread.is_alive()):
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='webling-sync', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def sync(self) -> int | None:
+        """Brings the mirror up to date and returns the synced revision."""
+        with self._sync_lock:
+            revision = self.revision()
+            if revision is not None:
+                try:
+                    return self._sync_changes(revision)
+                except (HTTPError, ResyncRequired) as e:
+                    LOGGER.warning('Incremental Webling sync failed, doing a full sync: %s', e)
+            return self._sync_full()
+
+    def revision(self) -> int | None:
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT value FROM sync_state WHERE key = 'revision'").fetchone()
+        return int(row[0]) if row else None
+
+    def ensure_synced(self):
+        """Blocks until the first full sync is done."""
+        if self.revision() is None:
+            self.sync()
+
+    def member_table(self, status: Status | None = None) -> MemberTable:
+        self.ensure_synced()
+        query = f'SELECT id, {MEMBER_COLUMNS} FROM member'
+        params: tuple = ()
+        if status is not None:
+            query += ' WHERE status = ?'
+            params = (status.value,)
+        with closing(self._connect()) as db:
+            return MemberTable.from_rows(db.execute(query, params).fetchall())
+
+    def active_member(self, email: str) -> Member | None:
+        self.ensure_synced()
+        with closing(self._connect()) as db:
+            row = db.execute(
+                f'SELECT {MEMBER_COLUMNS} FROM member WHERE email = ? AND status = ? LIMIT 1',
+                (email, Status.Aktiv.value)).fetchone()
+        return _member(row) if row else None
+
+    def article_table(self) -> ArticleTable:
+        self.ensure_synced()
+        with closing(self._connect()) as db:
+            return ArticleTable.from_rows(db.execute('SELECT id, title, price, quantity FROM article').fetchall())
+
+    def _run(self, interval: float):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                LOGGER.error('Webling sync failed: %s', e)
+            self._stop.wait(interval)
+
+    def _sync_full(self) -> int:
+        # read the revision first, changes made during the load are picked up by the next sync
+        revision = int(self.client.get('replicate').json()['revision'])
+        objects = {t: self.client.get(t, {'format': 'full'}).json() for t in self.TYPES}
+        with closing(self._connect()) as db, db:
+            for t in self.TYPES:
+                db.execute(f'DELETE FROM {t}')
+            db.execute('DELETE FROM membergroup_member')
+            for t, data in objects.items():
+                self._upsert(db, t, data)
+            self._set_revision(db, revision)
+        LOGGER.info('Full Webling sync at revision %d', revision)
+        return revision
+
+    def _sync_changes(self, revision: int) -> int:
+        changes = self.client.get(f'replicate/{revision}').json()
+        latest = int(changes.get('revision', revision))
+        if latest < 0 or changes.get('definitions') or changes.get('settings'):
+            raise ResyncRequired('Webling revision expired or data model changed')
+        if latest == revision:
+            return revision
+        changed = changes.get('objects', {})
+        objects = {t: self._fetch(t, changed.get(t, [])) for t in self.TYPES}
+        deleted = [int(i) for i in changes.get('deleted', [])]
+        with closing(self._connect()) as db, db:
+            for t, data in objects.items():
+                self._upsert(db, t, data)
+            if deleted:
+                marks = ','.join('?' * len(deleted))
+                for t in self.TYPES:
+                    db.execute(f'DELETE FROM {t} WHERE id IN ({marks})', deleted)
+                db.execute(f'DELETE FROM membergroup_member WHERE group_id IN ({marks})', deleted)
+                db.execute(f'DELETE FROM membergroup_member WHERE member_id IN ({marks})', deleted)
+            self._set_revision(db, latest)
+        LOGGER.info('Synced %d changed and %d deleted Webling objects up to revision %d',
+                    sum(len(d) for d in objects.values()), len(deleted), latest)
+        return latest
+
+    def _fetch(self, type_: str, ids: list[int]) -> list[dict[str, Any]]:
+        objects = []
+        for i in range(0, len(ids), self.CHUNK_SIZE):
+            chunk = [int(id_) for id_ in ids[i:i + self.CHUNK_SIZE]]
+            data = self.client.get(f'{type_}/{",".join(map(str, chunk))}').json()
+            # a single object is returned without a list and without its id
+            data = data if isinstance(data, list) else [data]
+            objects.extend({'id': id_, **obj} for id_, obj in zip(chunk, data))
+        return objects
+
+    def _upsert(self, db: sqlite3.Connection, type_: str, data: list[dict[str, Any]]):
+        if type_ == 'member':
+            rows = [(obj['id'], m.talent, m.status.value, m.start.isoformat(), m.end.isoformat() if m.end else None,
+                     m.email, m.first_name, m.last_name, m.heart_rate)
+                    for obj, m in zip(data, MEMBERS.validate_python(data))]
+            db.executemany(f'INSERT OR REPLACE INTO member (id, {MEMBER_COLUMNS}) VALUES (?,?,?,?,?,?,?,?,?)', rows)
+        elif type_ == 'membergroup':
+            for obj, g in zip(data, MEMBER_GROUPS.validate_python(data)):
+                db.execute('INSERT OR REPLACE INTO membergroup (id, name) VALUES (?, ?)', (obj['id'], g.name))
+                db.execute('DELETE FROM membergroup_member WHERE group_id = ?', (obj['id'],))
+                db.executemany('INSERT OR IGNORE INTO membergroup_member (group_id, member_id) VALUES (?, ?)',
+                               [(obj['id'], member_id) for member_id in g.members])
+        elif type_ == 'article':
+            rows = [(obj['id'], a.title, a.price, a.quantity) for obj, a in zip(data, ARTICLES.validate_python(data))]
+            db.executemany('INSERT OR REPLACE INTO article (id, title, price, quantity) VALUES (?,?,?,?)', rows)
+
+    def _set_revision(self, db: sqlite3.Connection, revision: int):
+        db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('revision', ?)", (str(revision),))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+
+def _member(row: tuple) -> Member:
+    talent, status, start, end, email, first_name, last_name, heart_rate = row
+    return Member.model_construct(
+        talent=bool(talent), status=Status(status), start=date.fromisoformat(start),
+        end=date.fromisoformat(end) if end else None, email=email,
+        first_name=first_name, last_name=last_name, heart_rate=heart_rate)
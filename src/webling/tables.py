@@ -0,0 +1,124 @@
+from dataclasses import dataclass, fields
+from functools import cached_property
+from typing import Any, Iterable, Sequence
+import numpy as np
+import pandas as pd
+from pydantic import TypeAdapter
+from webling.material import Article
+from webling.members import Member, MemberGroup, Status
+
+
+MEMBERS = TypeAdapter(list[Member])
+MEMBER_GROUPS = TypeAdapter(list[MemberGroup])
+ARTICLES = TypeAdapter(list[Article])
+STATUS = pd.CategoricalDtype([s.value for s in Status])
+# end year of members that have not left
+OPEN_END = np.iinfo(np.int32).max
+
+
+def _dates(values: Iterable[Any]) -> np.ndarray:
+    """ISO dates or `date` objects as `datetime64[D]`, `None` becomes NaT."""
+    return np.array(list(values), dtype='datetime64[D]')
+
+
+def _years(dates: np.ndarray) -> np.ndarray:
+    return dates.astype('datetime64[Y]').astype(np.int64) + 1970
+
+
+@dataclass(frozen=True)
+class MemberTable:
+    """Webling members as column arrays, one row per member.
+
+    `status` is categorical, `start` and `end` are `datetime64[D]` with NaT
+    for members that have not left. The year predicates (`is_active`,
+    `joined`, `left`) have the semantics of the `Member` methods of the same
+    name and return a boolean mask.
+    """
+
+    id: np.ndarray
+    talent: np.ndarray
+    status: pd.Categorical
+    start: np.ndarray
+    end: np.ndarray
+    email: np.ndarray
+    first_name: np.ndarray
+    last_name: np.ndarray
+    heart_rate: np.ndarray
+
+    @classmethod
+    def from_columns(cls, id: Sequence[int], talent: Sequence[bool], status: Sequence[str], start: Sequence,
+                     end: Sequence, email: Sequence[str | None], first_name: Sequence[str],
+                     last_name: Sequence[str], heart_rate: Sequence[int]) -> 'MemberTable':
+        return cls(
+            id=np.asarray(id, dtype=np.int64),
+            talent=np.asarray(talent, dtype=bool),
+            status=pd.Categorical([s.value if isinstance(s, Status) else s for s in status], dtype=STATUS),
+            start=_dates(start),
+            end=_dates(end),
+            email=np.asarray(email, dtype=object),
+            first_name=np.asarray(first_name, dtype=object),
+            last_name=np.asarray(last_name, dtype=object),
+            heart_rate=np.asarray(heart_rate, dtype=np.int32))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> 'MemberTable':
+        """Rows of (id, talent, status, start, end, email, first name, last name, heart rate)."""
+        columns = list(zip(*rows)) if rows else [()] * len(fields(cls))
+        return cls.from_columns(*columns)
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __getitem__(self, mask: np.ndarray | slice) -> 'MemberTable':
+        """Rows selected by a boolean mask, index array or slice."""
+        return MemberTable(**{f.name: getattr(self, f.name)[mask] for f in fields(self)})
+
+    @cached_property
+    def start_year(self) -> np.ndarray:
+        return _years(self.start)
+
+    @cached_property
+    def end_year(self) -> np.ndarray:
+        """Year the member left, `OPEN_END` if it has not."""
+        return np.where(np.isnat(self.end), OPEN_END, _years(self.end))
+
+    def has_status(self, *statuses: Status) -> np.ndarray:
+        return np.asarray(self.status.isin([s.value for s in statuses]))
+
+    def is_active(self, year: int) -> np.ndarray:
+        return ~self.has_status(Status.Aspirant) & (self.start_year <= year) & (year < self.end_year)
+
+    def joined(self, year: int) -> np.ndarray:
+        return ~self.has_status(Status.Aspirant) & (self.start_year == year)
+
+    def left(self, year: int) -> np.ndarray:
+        return ~np.isnat(self.end) & (self.end_year == year)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({f.name: getattr(self, f.name) for f in fields(self) if f.name != 'id'},
+                            index=pd.Index(self.id, name='id'))
+
+
+@dataclass(frozen=True)
+class ArticleTable:
+    id: np.ndarray
+    title: np.ndarray
+    price: np.ndarray
+    quantity: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> 'ArticleTable':
+        """Rows of (id, title, price, quantity)."""
+        id, title, price, quantity = list(zip(*rows)) if rows else [()] * 4
+        return cls(id=np.asarray(id, dtype=np.int64), title=np.asarray(title, dtype=object),
+                   price=np.asarray(price, dtype=np.float64), quantity=np.asarray(quantity, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def value(self) -> float:
+        return float(self.price @ self.quantity)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({'title': self.title, 'price': self.price, 'quantity': self.quantity},
+                            index=pd.Index(self.id, name='id'))
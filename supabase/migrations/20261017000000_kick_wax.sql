@@ -0,0 +1,26 @@
+-- The kick wax table as it exists in production, so that a local stand-in
+-- (`supabase start`, `supabase test db`) can apply the analytics migration.
+-- Does nothing where the table already exists.
+
+create table if not exists kickwax (
+    id bigint generated by default as identity primary key,
+    date date not null,
+    name text not null,
+    location text not null,
+    success_rate smallint not null,
+    created_by uuid not null default auth.uid() references auth.users(id) on delete cascade,
+    layers jsonb not null default '[]'
+);
+
+alter table kickwax enable row level security;
+
+do $$
+begin
+    if not exists (select 1 from pg_policies where tablename = 'kickwax') then
+        create policy kickwax_select on kickwax for select to authenticated using (true);
+        create policy kickwax_insert on kickwax for insert to authenticated with check (created_by = auth.uid());
+        create policy kickwax_update on kickwax for update to authenticated using (created_by = auth.uid());
+        create policy kickwax_delete on kickwax for delete to authenticated using (created_by = auth.uid());
+    end if;
+end
+$$;
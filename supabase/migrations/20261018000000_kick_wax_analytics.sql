@@ -0,0 +1,153 @@
+-- Kick wax analytics. All aggregations run in Postgres, the app only fetches
+-- their (small) results through the RPC functions at the end of this file.
+-- Assumes the existing `kickwax` table (id, date, name, location,
+-- success_rate, created_by, layers jsonb).
+
+-- layers as shown in the app, e.g. 'Swix V40 - Gebügelt / Toko Red - Gekorkt'
+create or replace function kickwax_combination(layers jsonb) returns text
+language sql immutable as $$
+    select coalesce(string_agg(l->>'brand' || ' ' || (l->>'name') || ' - ' || (l->>'application'), ' / ' order by n), '')
+    from jsonb_array_elements(layers) with ordinality as t(l, n)
+$$;
+
+-- one row per wax layer
+create or replace view kickwax_layer as
+select k.id as kickwax_id,
+       t.n::int as position,
+       t.l->>'brand' as brand,
+       t.l->>'name' as product,
+       t.l->>'application' as application,
+       k.success_rate
+from kickwax k
+cross join lateral jsonb_array_elements(k.layers) with ordinality as t(l, n);
+
+-- weather at the location and date of an entry, filled in by the app
+create table if not exists kickwax_conditions (
+    kickwax_id bigint primary key references kickwax(id) on delete cascade,
+    temp real,
+    humidity real,
+    snow real,
+    conditions text,
+    combination text not null default '',
+    success_rate smallint not null default 0
+);
+
+-- success per layer combination and condition bin (2 °C, 10 % humidity),
+-- kept up to date by the triggers below so lookups do not scan the entries
+create table if not exists kickwax_condition_stats (
+    temp_bin int not null,
+    humidity_bin int not null,
+    combination text not null,
+    entries bigint not null default 0,
+    success_sum bigint not null default 0,
+    primary key (temp_bin, humidity_bin, combination)
+);
+
+alter table kickwax_conditions enable row level security;
+alter table kickwax_condition_stats enable row level security;
+
+create or replace function kickwax_conditions_fill() returns trigger
+language plpgsql as $$
+begin
+    select kickwax_combination(k.layers), k.success_rate
+    into new.combination, new.success_rate
+    from kickwax k where k.id = new.kickwax_id;
+    return new;
+end
+$$;
+
+create or replace function kickwax_conditions_aggregate() returns trigger
+language plpgsql as $$
+begin
+    if tg_op in ('DELETE', 'UPDATE') and old.temp is not null and old.humidity is not null then
+        update kickwax_condition_stats
+        set entries = entries - 1, success_sum = success_sum - old.success_rate
+        where temp_bin = floor(old.temp / 2) and humidity_bin = floor(old.humidity / 10)
+          and combination = old.combination;
+        delete from kickwax_condition_stats where entries <= 0;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.temp is not null and new.humidity is not null then
+        insert into kickwax_condition_stats as s (temp_bin, humidity_bin, combination, entries, success_sum)
+        values (floor(new.temp / 2), floor(new.humidity / 10), new.combination, 1, new.success_rate)
+        on conflict (temp_bin, humidity_bin, combination)
+        do update set entries = s.entries + 1, success_sum = s.success_sum + excluded.success_sum;
+    end if;
+    return null;
+end
+$$;
+
+drop trigger if exists kickwax_conditions_fill on kickwax_conditions;
+create trigger kickwax_conditions_fill
+    before insert or update on kickwax_conditions
+    for each row execute function kickwax_conditions_fill();
+
+drop trigger if exists kickwax_conditions_aggregate on kickwax_conditions;
+create trigger kickwax_conditions_aggregate
+    after insert or update or delete on kickwax_conditions
+    for each row execute function kickwax_conditions_aggregate();
+
+-- RPC functions, security definer since the statistics cover all entries
+
+-- entries and mean success per 'brand', 'application' or layer 'combination'
+create or replace function kickwax_success_by(dimension text)
+returns table (key text, entries bigint, success_rate numeric)
+language sql stable security definer set search_path = public as $$
+    select kickwax_combination(k.layers), count(*), round(avg(k.success_rate), 2)
+    from kickwax k
+    where kickwax_success_by.dimension = 'combination'
+    group by 1
+    union all
+    select case kickwax_success_by.dimension when 'brand' then l.brand else l.application end,
+           count(distinct l.kickwax_id), round(avg(l.success_rate), 2)
+    from kickwax_layer l
+    where kickwax_success_by.dimension in ('brand', 'application')
+    group by 1
+    order by 3 desc, 2 desc
+$$;
+
+-- best layer combinations at similar conditions, reads the pre-aggregated bins only
+create or replace function kickwax_at_conditions(
+    temp real, humidity real, temp_tolerance real default 2, humidity_tolerance real default 10, top int default 10)
+returns table (combination text, entries bigint, success_rate numeric)
+language sql stable security definer set search_path = public as $$
+    select s.combination, sum(s.entries)::bigint, round(sum(s.success_sum)::numeric / sum(s.entries), 2)
+    from kickwax_condition_stats s
+    where s.temp_bin between floor((kickwax_at_conditions.temp - temp_tolerance) / 2)
+                         and floor((kickwax_at_conditions.temp + temp_tolerance) / 2)
+      and s.humidity_bin between floor((kickwax_at_conditions.humidity - humidity_tolerance) / 10)
+                             and floor((kickwax_at_conditions.humidity + humidity_tolerance) / 10)
+    group by s.combination
+    order by 3 desc, 2 desc
+    limit top
+$$;
+
+-- entries whose weather has not been looked up yet
+create or replace function kickwax_without_conditions(max_rows int default 10)
+returns table (id bigint, location text, date date)
+language sql stable security definer set search_path = public as $$
+    select k.id, k.location, k.date
+    from kickwax k
+    left join kickwax_conditions c on c.kickwax_id = k.id
+    where c.kickwax_id is null
+    order by k.date desc
+    limit max_rows
+$$;
+
+create or replace function kickwax_set_conditions(
+    entry_id bigint, temp real, humidity real, snow real, conditions text)
+returns void
+language sql volatile security definer set search_path = public as $$
+    insert into kickwax_conditions (kickwax_id, temp, humidity, snow, conditions)
+    values (entry_id, temp, humidity, snow, conditions)
+    on conflict (kickwax_id) do update
+    set temp = excluded.temp, humidity = excluded.humidity, snow = excluded.snow, conditions = excluded.conditions
+$$;
+
+revoke execute on function kickwax_success_by(text) from public, anon;
+revoke execute on function kickwax_at_conditions(real, real, real, real, int) from public, anon;
+revoke execute on function kickwax_without_conditions(int) from public, anon;
+revoke execute on function kickwax_set_conditions(bigint, real, real, real, text) from public, anon;
+grant execute on function kickwax_success_by(text) to authenticated;
+grant execute on function kickwax_at_conditions(real, real, real, real, int) to authenticated;
+grant execute on function kickwax_without_conditions(int) to authenticated;
+grant execute on function kickwax_set_conditions(bigint, real, real, real, text) to authenticated;
@@ -0,0 +1,79 @@
+-- Conditions of an entry may only be set by its owner or the service role
+-- (the precompute job). Failed weather lookups are recorded and retried once
+-- a day, three times at most. Editing an entry updates its conditions.
+
+alter table kickwax_conditions
+    add column if not exists failures int not null default 0,
+    add column if not exists checked_at timestamptz not null default now();
+
+create or replace function kickwax_assert_may_edit(entry_id bigint) returns void
+language plpgsql stable security definer set search_path = public as $$
+begin
+    if coalesce(auth.role(), '') <> 'service_role'
+       and not exists (select 1 from kickwax k where k.id = entry_id and k.created_by = auth.uid()) then
+        raise exception 'not allowed to change the conditions of kickwax entry %', entry_id using errcode = '42501';
+    end if;
+end
+$$;
+
+create or replace function kickwax_set_conditions(
+    entry_id bigint, temp real, humidity real, snow real, conditions text)
+returns void
+language plpgsql volatile security definer set search_path = public as $$
+begin
+    perform kickwax_assert_may_edit(entry_id);
+    insert into kickwax_conditions (kickwax_id, temp, humidity, snow, conditions)
+    values (entry_id, temp, humidity, snow, conditions)
+    on conflict (kickwax_id) do update
+    set temp = excluded.temp, humidity = excluded.humidity, snow = excluded.snow, conditions = excluded.conditions,
+        failures = 0, checked_at = now();
+end
+$$;
+
+-- records a failed weather lookup, the entry is skipped by kickwax_without_conditions for a day
+create or replace function kickwax_conditions_failed(entry_id bigint) returns void
+language plpgsql volatile security definer set search_path = public as $$
+begin
+    perform kickwax_assert_may_edit(entry_id);
+    insert into kickwax_conditions (kickwax_id, failures) values (entry_id, 1)
+    on conflict (kickwax_id) do update
+    set failures = kickwax_conditions.failures + 1, checked_at = now();
+end
+$$;
+
+-- entries whose weather has not been looked up yet, or whose last lookup failed a day ago
+create or replace function kickwax_without_conditions(max_rows int default 10)
+returns table (id bigint, location text, date date)
+language sql stable security definer set search_path = public as $$
+    select k.id, k.location, k.date
+    from kickwax k
+    left join kickwax_conditions c on c.kickwax_id = k.id
+    where c.kickwax_id is null
+       or (c.failures between 1 and 2 and c.checked_at < now() - interval '1 day')
+    order by k.date desc
+    limit max_rows
+$$;
+
+-- the fill trigger recomputes combination and success rate, the aggregate trigger moves the entry between the bins
+create or replace function kickwax_refresh_conditions() returns trigger
+language plpgsql security definer set search_path = public as $$
+begin
+    update kickwax_conditions set kickwax_id = new.id where kickwax_id = new.id;
+    return null;
+end
+$$;
+
+drop trigger if exists kickwax_refresh_conditions on kickwax;
+create trigger kickwax_refresh_conditions
+    after update of layers, success_rate on kickwax
+    for each row
+    when (old.layers is distinct from new.layers or old.success_rate is distinct from new.success_rate)
+    execute function kickwax_refresh_conditions();
+
+revoke execute on function kickwax_assert_may_edit(bigint) from public, anon, authenticated;
+revoke execute on function kickwax_conditions_failed(bigint) from public, anon;
+revoke execute on function kickwax_without_conditions(int) from authenticated;
+revoke execute on function kickwax_refresh_conditions() from public, anon, authenticated;
+grant execute on function kickwax_set_conditions(bigint, real, real, real, text) to authenticated, service_role;
+grant execute on function kickwax_conditions_failed(bigint) to authenticated, service_role;
+grant execute on function kickwax_without_conditions(int) to service_role;
@@ -0,0 +1,60 @@
+-- pgTAP tests of the kick wax analytics, run against a local stand-in with
+-- `supabase start && supabase test db`
+begin;
+create extension if not exists pgtap with schema extensions;
+select plan(13);
+
+insert into auth.users (id, email) values
+    ('00000000-0000-0000-0000-000000000001', 'owner@example.com'),
+    ('00000000-0000-0000-0000-000000000002', 'other@example.com');
+insert into kickwax (id, date, name, location, success_rate, created_by, layers) values
+    (1, '2024-01-20', 'first', 'Pontresina', 4, '00000000-0000-0000-0000-000000000001',
+     '[{"brand": "Swix", "name": "V40", "application": "Gebügelt"}]'),
+    (2, '2024-01-21', 'second', 'Zuoz', 2, '00000000-0000-0000-0000-000000000002',
+     '[{"brand": "Toko", "name": "Red", "application": "Gekorkt"}]');
+
+-- only the owner may set the conditions of an entry
+set local role authenticated;
+set local request.jwt.claims = '{"sub": "00000000-0000-0000-0000-000000000001", "role": "authenticated"}';
+select lives_ok($$ select kickwax_set_conditions(1, -5, 80, 0, 'Snow') $$, 'owner sets the conditions');
+select throws_ok($$ select kickwax_set_conditions(2, 10, 20, 0, 'Clear') $$, '42501', null,
+                 'others cannot set the conditions');
+select throws_ok($$ select kickwax_conditions_failed(2) $$, '42501', null, 'others cannot record failures');
+select throws_ok($$ select * from kickwax_without_conditions(10) $$, '42501', null,
+                 'users cannot list the entries to backfill');
+reset role;
+
+select results_eq(
+    $$ select combination, success_rate from kickwax_conditions where kickwax_id = 1 $$,
+    $$ values ('Swix V40 - Gebügelt', 4::smallint) $$,
+    'combination and success rate are filled in');
+select results_eq(
+    $$ select temp_bin, humidity_bin, entries, success_sum from kickwax_condition_stats $$,
+    $$ values (-3, 8, 1::bigint, 4::bigint) $$,
+    'the entry is counted in its bin');
+
+-- editing an entry updates its conditions and statistics
+update kickwax set success_rate = 2 where id = 1;
+select is((select success_rate from kickwax_conditions where kickwax_id = 1), 2::smallint,
+          'success rate follows the entry');
+select results_eq(
+    $$ select entries, success_sum from kickwax_condition_stats $$,
+    $$ values (1::bigint, 2::bigint) $$,
+    'statistics follow the entry');
+
+-- failed lookups are retried after a day, three times at most
+set local role service_role;
+set local request.jwt.claims = '{"role": "service_role"}';
+select results_eq($$ select id from kickwax_without_conditions(10) $$, $$ values (2::bigint) $$,
+                  'entries without conditions are listed');
+select lives_ok($$ select kickwax_conditions_failed(2) $$, 'the service role records a failed lookup');
+select is_empty($$ select id from kickwax_without_conditions(10) $$, 'failed lookups are not retried right away');
+reset role;
+update kickwax_conditions set checked_at = now() - interval '2 days' where kickwax_id = 2;
+select results_eq($$ select id from kickwax_without_conditions(10) $$, $$ values (2::bigint) $$,
+                  'failed lookups are retried after a day');
+update kickwax_conditions set failures = 3 where kickwax_id = 2;
+select is_empty($$ select id from kickwax_without_conditions(10) $$, 'lookups are given up after three failures');
+
+select * from finish();
+rollback;
@@ -0,0 +1,25 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from atomic_file import atomic_path
+
+
+def test_concurrent_writers_leave_a_complete_file(tmp_path):
+    path = tmp_path / 'index.json'
+    def write(i: int):
+        with atomic_path(path) as tmp, open(tmp, 'w') as f:
+            json.dump({'writer': i, 'data': list(range(10_000))}, f)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(write, range(32)))
+    assert len(json.loads(path.read_text())['data']) == 10_000
+    assert [p.name for p in tmp_path.iterdir()] == ['index.json']
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / 'manifest.json'
+    path.write_text('{}')
+    with pytest.raises(ValueError), atomic_path(path) as tmp:
+        tmp.write_text('{"partial"')
+        raise ValueError('failed')
+    assert path.read_text() == '{}'
+    assert [p.name for p in tmp_path.iterdir()] == ['manifest.json']
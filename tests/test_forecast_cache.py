@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+from requests import ConnectionError
+from weather.cache import ForecastCache
+
+
+LOCATION = '46.4906,9.8355'
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.down = False
+
+    def __call__(self, location: str) -> pd.DataFrame:
+        self.calls += 1
+        if self.down:
+            raise ConnectionError('VisualCrossing is down')
+        return pd.DataFrame({'temp': [-5.0 + self.calls]})
+
+
+def expire(cache: ForecastCache):
+    cache._update_index(lambda index: [entry.update(fetched=entry['fetched'] - cache.ttl) for entry in index.values()])
+    cache._memory.invalidate(cache.location(LOCATION))
+
+
+def test_stale_forecast_served_without_retrying(tmp_path):
+    cache, loader = ForecastCache(tmp_path, ttl=60, retry_after=30), Loader()
+    cache.get(LOCATION, loader)
+    expire(cache)
+    loader.down = True
+    for _ in range(3):
+        assert cache.get(LOCATION, loader)['temp'].tolist() == [-4.0]
+    # a single failed request, then the stale copy until the retry time
+    assert loader.calls == 2
+    with pytest.raises(ConnectionError):
+        cache.refresh(LOCATION, loader)
+
+
+def test_index_shared_between_processes(tmp_path):
+    app, precompute, loader = ForecastCache(tmp_path), ForecastCache(tmp_path), Loader()
+    locations = [LOCATION, '47.3769,8.5417', '46.8499,9.5329']
+    app.get(locations[0], loader)
+    precompute.get(locations[1], loader)
+    app.get(locations[2], loader)
+    assert sorted(ForecastCache(tmp_path).locations()) == sorted(app.location(location) for location in locations)
+    assert precompute.age(locations[0]) is not None
@@ -0,0 +1,15 @@
+import pytest
+from weather.forecast import DailyQuota, ForecastClient, QuotaExceeded
+
+
+def test_quota_shared_between_processes(tmp_path):
+    app, precompute = DailyQuota(tmp_path / 'quota.json', 3), DailyQuota(tmp_path / 'quota.json', 3)
+    assert app.take() and precompute.take() and app.take()
+    assert not precompute.take()
+    assert app.used() == 3
+
+
+def test_client_stops_requesting_when_quota_used_up(tmp_path):
+    client = ForecastClient('http://127.0.0.1:9', 'key', quota=DailyQuota(tmp_path / 'quota.json', 0))
+    with pytest.raises(QuotaExceeded):
+        client.load('46.4906,9.8355')
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from race_matrix import NAT, RaceMatrix
+
+
+def race() -> RaceMatrix:
+    seconds = pd.DataFrame({'0': [0, 60, 120], '10': [2400, 2700, NAT]}, index=pd.Index(['Anna', 'Beat', 'Cla'], name='skier'))
+    return RaceMatrix.from_seconds(seconds)
+
+
+def test_select_keeps_derived_rows():
+    matrix = race()
+    matrix.elapsed  # derived rows computed before the selection
+    selected = matrix.select(['Beat', 'Anna', 'Beat'])
+    assert list(selected.skiers) == ['Beat', 'Anna']
+    assert np.array_equal(selected.elapsed, race().select(['Beat', 'Anna']).elapsed, equal_nan=True)
+
+
+def test_carry_derived_fills_repeated_rows():
+    matrix = race()
+    matrix.elapsed  # derived rows computed before the selection
+    rows = np.array([0, 1, 2, 2])
+    repeated = RaceMatrix(times=matrix.times[rows], km=matrix.km, skiers=matrix.skiers[rows], columns=matrix.columns)
+    result = matrix._carry_derived(repeated, rows)
+    assert np.array_equal(result.elapsed, matrix.elapsed[rows], equal_nan=True)
@@ -0,0 +1,37 @@
+import numpy as np
+from race_matrix import NAT, RaceMatrix
+from result_sheet import read_result_sheet
+from result_store import ResultStore
+
+
+SHEET = (b'skier,club,0,10\n'
+         b'Anna,LC Zurich,0:00:00,0:41:10\n'
+         b'Beat,,0:00:00,\n'
+         b',,,\n'
+         b',,,\n')
+
+
+def test_read_result_sheet_drops_empty_rows():
+    df = read_result_sheet(SHEET, labels=['club'])
+    assert df['skier'].tolist() == ['Anna', 'Beat']
+    assert df['10'].tolist() == [41 * 60 + 10, NAT]
+
+
+def test_ingest_sheet_with_empty_rows(tmp_path):
+    df = read_result_sheet(SHEET, labels=['club'])
+    race = RaceMatrix.from_seconds(df.set_index('skier').drop(columns=['club']))
+    store = ResultStore(tmp_path)
+    assert store.ingest({'Engadiner': lambda: race}) == {'Engadiner': True}
+    assert store.races_of('Anna') == ['Engadiner']
+    assert list(store.race_matrix('Engadiner').skiers) == ['Anna', 'Beat']
+
+
+def test_ingest_keeps_races_of_other_processes(tmp_path):
+    race = RaceMatrix.from_seconds(read_result_sheet(SHEET, labels=['club']).set_index('skier').drop(columns=['club']))
+    store, precompute = ResultStore(tmp_path), ResultStore(tmp_path)
+    precompute.ingest({'Engadiner': lambda: race})
+    store.ingest({'Vasaloppet': lambda: race})
+    assert sorted(ResultStore(tmp_path).races()) == ['Engadiner', 'Vasaloppet']
+    # unchanged races are not written again, also if another process ingested them
+    assert store.ingest({'Engadiner': lambda: race}) == {'Engadiner': False}
+    assert np.array_equal(store.race_matrix('Engadiner').times, race.times)
@@ -0,0 +1,35 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from result_sheet import read_result_sheet
+from sheet_cache import SheetCache
+
+
+class Sheets(BaseHTTPRequestHandler):
+    body = b'skier,0\nAnna,0:00:00\n'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(Sheets.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Sheets)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}/export'
+    server.shutdown()
+
+
+def test_unparsable_download_serves_cached_copy(tmp_path, url):
+    cache = SheetCache(tmp_path, ttl=0)
+    Sheets.body = b'skier,0\nAnna,0:00:00\n'
+    assert cache.get('race', url, read_result_sheet)['skier'].tolist() == ['Anna']
+    Sheets.body = b'<html>Sign in to continue</html>'
+    assert cache.get('race', url, read_result_sheet)['skier'].tolist() == ['Anna']
+    with pytest.raises(ValueError):
+        SheetCache(tmp_path / 'empty', ttl=0).get('race', url, read_result_sheet)
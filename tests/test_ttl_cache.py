@@ -0,0 +1,33 @@
+import threading
+from ttl_cache import TTLCache
+
+
+def test_invalidate_releases_key_locks():
+    cache = TTLCache(ttl=60)
+    for key in range(100):
+        cache.get(key, lambda: key)
+        cache.invalidate(key)
+    for key in range(100):
+        cache.get(key, lambda: key)
+    cache.invalidate()
+    assert len(cache) == 0
+    assert not cache._loading
+
+
+def test_invalidate_keeps_lock_of_running_load():
+    cache = TTLCache(ttl=60)
+    started, release = threading.Event(), threading.Event()
+
+    def load():
+        started.set()
+        release.wait()
+        return 'value'
+
+    loader = threading.Thread(target=cache.get, args=('key', load))
+    loader.start()
+    started.wait()
+    cache.invalidate()
+    assert 'key' in cache._loading
+    release.set()
+    loader.join()
+    assert cache.get('key', lambda: 'other') == 'value'